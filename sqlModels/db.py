@@ -15,6 +15,10 @@ def connect(db_path: str) -> sqlite3.Connection:
     con.execute("PRAGMA journal_mode = WAL")
     con.execute("PRAGMA synchronous = NORMAL")
     con.execute("PRAGMA busy_timeout = 5000")
+    # Lecturas grandes (catálogo) sin pasar por disco: temp en RAM, mmap 256 MB, cache 64 MB.
+    con.execute("PRAGMA temp_store = MEMORY")
+    con.execute("PRAGMA mmap_size = 268435456")
+    con.execute("PRAGMA cache_size = -65536")
     return con
 
 
@@ -146,6 +150,21 @@ def _is_create_index_stmt(stmt: str) -> bool:
     return s.startswith("create index") or s.startswith("create unique index")
 
 
+# Archivos de DB ya asegurados en este proceso: las siguientes llamadas solo
+# confirman meta.schema_version en vez de re-ejecutar todo el DDL.
+_ENSURED_DB_FILES: set[str] = set()
+
+
+def _main_db_file(con: sqlite3.Connection) -> str:
+    try:
+        for r in con.execute("PRAGMA database_list").fetchall():
+            if r[1] == "main":
+                return str(r[2] or "")
+    except Exception:
+        pass
+    return ""
+
+
 def ensure_schema(con: sqlite3.Connection) -> None:
     """
     - Aplica DDL idempotente
@@ -153,6 +172,17 @@ def ensure_schema(con: sqlite3.Connection) -> None:
     - Reintenta índices que dependan de columnas nuevas (ej: estado)
     - Deja meta.schema_version = SCHEMA_VERSION
     """
+    db_file = _main_db_file(con)
+    if db_file and db_file in _ENSURED_DB_FILES and _get_meta(con, "schema_version") == str(SCHEMA_VERSION):
+        return
+
+    _ensure_schema_full(con)
+
+    if db_file:
+        _ENSURED_DB_FILES.add(db_file)
+
+
+def _ensure_schema_full(con: sqlite3.Connection) -> None:
     with tx(con):
         deferred_indexes: list[str] = []
 
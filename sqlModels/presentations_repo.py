@@ -5,7 +5,7 @@ import sqlite3
 
 import pandas as pd
 
-from .utils import now_iso
+from .utils import now_iso, read_sql_compact
 
 
 def _to_text(v) -> str:
@@ -427,5 +427,5 @@ def rebuild_presentations_rollup(con: sqlite3.Connection) -> None:
         )
 
 
-def load_presentations_current(con: sqlite3.Connection) -> pd.DataFrame:
-    return pd.read_sql_query("SELECT * FROM presentations_current", con)
+def load_presentations_current(con: sqlite3.Connection, cursor: sqlite3.Cursor | None = None) -> pd.DataFrame:
+    return read_sql_compact(con, "SELECT * FROM presentations_current", cursor=cursor)
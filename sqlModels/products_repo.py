@@ -6,7 +6,7 @@ import sqlite3
 
 import pandas as pd
 
-from .utils import now_iso
+from .utils import now_iso, read_sql_compact
 
 def _to_float(v, default: float = 0.0) -> float:
     try:
@@ -223,5 +223,5 @@ def upsert_products_snapshot(
         )
 
 
-def load_products_current(con: sqlite3.Connection) -> pd.DataFrame:
-    return pd.read_sql_query("SELECT * FROM products_current", con)
+def load_products_current(con: sqlite3.Connection, cursor: sqlite3.Cursor | None = None) -> pd.DataFrame:
+    return read_sql_compact(con, "SELECT * FROM products_current", cursor=cursor)
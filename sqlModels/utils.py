@@ -4,6 +4,10 @@ import hashlib
 import os
 import datetime
 
+import pandas as pd
+
+READ_SQL_CHUNKSIZE = 10000
+
 def now_iso() -> str:
     return datetime.datetime.now().isoformat(timespec="seconds")
 
@@ -20,3 +24,66 @@ def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
 def stat_file(path: str) -> tuple[float, int]:
     st = os.stat(path)
     return (st.st_mtime, st.st_size)
+
+def quick_file_signature(path: str, head_size: int = 64 * 1024) -> str:
+    """
+    Firma barata de un archivo: tamaño, mtime_ns y hash de los primeros 64 KB.
+    Sirve para detectar "no cambió" sin leer el archivo completo.
+    """
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        head = f.read(head_size)
+    digest = hashlib.blake2b(head, digest_size=16).hexdigest()
+    return f"{st.st_size}:{st.st_mtime_ns}:{digest}"
+
+
+def _downcast_int_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce columnas enteras al tipo minimo (int8/int16/...).
+    Los REAL se dejan en float64: son precios/stock y float32 pierde centavos.
+    """
+    for col in df.columns:
+        ser = df[col]
+        if pd.api.types.is_integer_dtype(ser) and not pd.api.types.is_bool_dtype(ser):
+            kind = "unsigned" if (ser.empty or int(ser.min()) >= 0) else "integer"
+            df[col] = pd.to_numeric(ser, downcast=kind)
+    return df
+
+
+def read_sql_compact(
+    con,
+    sql: str,
+    params=(),
+    chunksize: int = READ_SQL_CHUNKSIZE,
+    cursor=None,
+) -> pd.DataFrame:
+    """
+    Lee un SELECT por bloques de `chunksize` filas y une los bloques con
+    enteros reducidos, para no materializar todo el catalogo en int64.
+    Si se pasa `cursor`, se reutiliza (varias lecturas, un solo cursor).
+    """
+    cur = cursor if cursor is not None else con.cursor()
+    prev_factory = cur.row_factory
+    cur.row_factory = None  # tuplas planas: from_records no entiende sqlite3.Row
+    try:
+        cur.execute(sql, params)
+        columns = [d[0] for d in (cur.description or ())]
+        chunks: list[pd.DataFrame] = []
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            chunks.append(
+                _downcast_int_columns(pd.DataFrame.from_records(rows, columns=columns, coerce_float=True))
+            )
+    finally:
+        cur.row_factory = prev_factory
+        if cursor is None:
+            cur.close()
+
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    if len(chunks) == 1:
+        return chunks[0]
+    # Un bloque puede quedar en int8 y otro en int16: se re-reduce tras unir.
+    return _downcast_int_columns(pd.concat(chunks, ignore_index=True))
@@ -12,6 +12,7 @@ from sqlModels.db import connect, ensure_schema
 from sqlModels.quotes_repo import STATUS_PENDIENTE
 
 from ...paths import DATA_DIR
+from ...catalog_manager import df_to_records
 from ...config import APP_COUNTRY, CATS
 from ...product_rules import is_py_unit_product
 from .resolvers import resolve_client_from_history, resolve_product_candidates, month_range_from_today
@@ -335,7 +336,7 @@ def _find_row_by_code_df(df, code: str) -> Optional[dict]:
     if not cu:
         return None
     try:
-        recs = df.to_dict("records")
+        recs = df_to_records(df)
     except Exception:
         return None
 
@@ -602,7 +603,7 @@ def export_catalog_for_assistant(catalog_manager) -> None:
         p_path = os.path.join(base, "products.jsonl")
         with open(p_path, "w", encoding="utf-8") as f:
             if dfp is not None and (not dfp.empty):
-                for r in dfp.to_dict("records"):
+                for r in df_to_records(dfp):
                     pid = str(r.get("id") or r.get("ID") or "").strip().upper()
                     if not pid:
                         continue
@@ -618,7 +619,7 @@ def export_catalog_for_assistant(catalog_manager) -> None:
         pr_path = os.path.join(base, "presentations.jsonl")
         with open(pr_path, "w", encoding="utf-8") as f:
             if dfpr is not None and (not dfpr.empty):
-                for r in dfpr.to_dict("records"):
+                for r in df_to_records(dfpr):
                     cn = str(r.get("CODIGO_NORM") or r.get("codigo_norm") or "").strip().upper()
                     if not cn:
                         cn = str(r.get("CODIGO") or r.get("codigo") or "").strip().upper()
@@ -7,6 +7,8 @@ from typing import Optional
 
 from sqlModels.db import connect, ensure_schema
 
+from ...catalog_manager import presentation_records, product_records
+
 
 def resolve_client_from_history(db_path: str, query: str) -> Optional[tuple[str, str, str]]:
     """
@@ -80,13 +82,13 @@ def resolve_product_candidates(window, query: str, limit: int = 6, allow_weak: b
             try:
                 dfp = getattr(cm, "df_productos", None)
                 if dfp is not None and (not dfp.empty):
-                    prod = dfp.to_dict("records")
+                    prod = cm.records_for(dfp, product_records)
             except Exception:
                 pass
             try:
                 dfpr = getattr(cm, "df_presentaciones", None)
                 if dfpr is not None and (not dfpr.empty):
-                    pres = dfpr.to_dict("records")
+                    pres = cm.records_for(dfpr, presentation_records)
             except Exception:
                 pass
 
@@ -5,14 +5,17 @@ import os
 import sys
 import time
 import json
+import queue
 import ctypes
+import threading
+from functools import lru_cache
 import pandas as pd
 from ctypes import wintypes
 
 from PySide6.QtWidgets import (
     QApplication, QMessageBox, QDialog, QVBoxLayout, QLabel, QProgressBar, QPlainTextEdit, QPushButton
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 
 from .paths import set_win_app_id, load_app_icon, ensure_data_seed_if_empty, DATA_DIR
 from .logging_setup import get_logger
@@ -21,7 +24,7 @@ from .config import COUNTRY_CODE, APP_CONFIG, ENABLE_AI
 from .db_path import resolve_db_path
 from .catalog_sync import (
     sync_catalog_from_excel_to_db,
-    load_catalog_from_db,
+    load_catalog_cached,
     validate_products_catalog_df,
     products_update_required_message,
 )
@@ -37,10 +40,11 @@ from .api.presupuesto_client import verify_cotizador_signature_once
 from .ui_theme import apply_modern_theme
 log = get_logger(__name__)
 
-_MUTEX_HANDLE = None
 _MUTEX_NAME = "Local\\SistemaCotizaciones_SingleInstance"
 _SHOW_EVENT_NAME = "Local\\SistemaCotizaciones_ShowMainWindow"
 ERROR_ALREADY_EXISTS = 183
+WAIT_OBJECT_0 = 0
+_SHOW_EVENT_POLL_MS = 300
 
 
 def _app_root() -> str:
@@ -195,49 +199,132 @@ def _show_changelog_if_pending(app_root: str, app_icon=None) -> None:
         pass
 
 
-def _request_show_existing_and_exit() -> None:
-    try:
-        OpenEventW = ctypes.windll.kernel32.OpenEventW
-        OpenEventW.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
-        OpenEventW.restype = wintypes.HANDLE
+@lru_cache(maxsize=1)
+def _kernel32():
+    """
+    kernel32 con los prototipos que usa el control de instancia única.
+    None fuera de Windows.
+    """
+    if not sys.platform.startswith("win"):
+        return None
+    k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    k32.CreateMutexW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.LPCWSTR]
+    k32.CreateMutexW.restype = wintypes.HANDLE
+
+    k32.CreateEventW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+    k32.CreateEventW.restype = wintypes.HANDLE
+
+    k32.OpenEventW.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.LPCWSTR]
+    k32.OpenEventW.restype = wintypes.HANDLE
 
-        SetEvent = ctypes.windll.kernel32.SetEvent
-        SetEvent.argtypes = [wintypes.HANDLE]
-        SetEvent.restype = wintypes.BOOL
+    k32.SetEvent.argtypes = [wintypes.HANDLE]
+    k32.SetEvent.restype = wintypes.BOOL
 
-        CloseHandle = ctypes.windll.kernel32.CloseHandle
-        CloseHandle.argtypes = [wintypes.HANDLE]
-        CloseHandle.restype = wintypes.BOOL
+    k32.ResetEvent.argtypes = [wintypes.HANDLE]
+    k32.ResetEvent.restype = wintypes.BOOL
 
+    k32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    k32.WaitForSingleObject.restype = wintypes.DWORD
+
+    k32.CloseHandle.argtypes = [wintypes.HANDLE]
+    k32.CloseHandle.restype = wintypes.BOOL
+    return k32
+
+
+def _request_show_existing_and_exit() -> None:
+    k32 = _kernel32()
+    if k32 is not None:
         EVENT_MODIFY_STATE = 0x0002
-        h_evt = OpenEventW(EVENT_MODIFY_STATE, False, _SHOW_EVENT_NAME)
+        h_evt = k32.OpenEventW(EVENT_MODIFY_STATE, False, _SHOW_EVENT_NAME)
         if h_evt:
-            SetEvent(h_evt)
-            CloseHandle(h_evt)
+            k32.SetEvent(h_evt)
+            k32.CloseHandle(h_evt)
+    sys.exit(0)
+
+
+def _single_instance_or_raise_existing():
+    """
+    Toma el mutex de instancia única y devuelve su handle (None si no aplica).
+    Si otra instancia ya lo tiene, le pide mostrarse y sale.
+    """
+    k32 = _kernel32()
+    if k32 is None:
+        return None
+
+    h = k32.CreateMutexW(None, True, _MUTEX_NAME)
+    if not h:
+        return None
+
+    if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+        _request_show_existing_and_exit()
+
+    return h
+
+
+def _bring_window_to_front(win) -> None:
+    try:
+        if win.isMinimized():
+            win.showNormal()
+        else:
+            win.show()
+        win.raise_()
+        win.activateWindow()
     except Exception:
         pass
-    sys.exit(0)
 
 
-def _single_instance_or_raise_existing() -> None:
-    global _MUTEX_HANDLE
+def _listen_show_requests(app, win) -> None:
+    """
+    Instancia principal: crea el evento con nombre que señala
+    `_request_show_existing_and_exit` y trae `win` al frente cuando llega.
+    """
+    k32 = _kernel32()
+    if k32 is None:
+        return
+
+    # Manual-reset: varios SetEvent antes de atenderlo quedan en una sola señal.
+    # _overlapped/_winapi (extensiones C del stdlib) evitan el trampolín de ctypes.
     try:
-        CreateMutexW = ctypes.windll.kernel32.CreateMutexW
-        CreateMutexW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.LPCWSTR]
-        CreateMutexW.restype = wintypes.HANDLE
+        import _overlapped
+        import _winapi
+
+        h_evt = _overlapped.CreateEvent(None, True, False, _SHOW_EVENT_NAME)
+        reset = _overlapped.ResetEvent
+        wait = _winapi.WaitForSingleObject
+    except (ImportError, AttributeError, OSError):
+        h_evt = k32.CreateEventW(None, True, False, _SHOW_EVENT_NAME)
+        reset = k32.ResetEvent
+        wait = k32.WaitForSingleObject
+    if not h_evt:
+        return
 
-        GetLastError = ctypes.windll.kernel32.GetLastError
+    app._show_event_handle = h_evt
 
-        h = CreateMutexW(None, True, _MUTEX_NAME)
-        if not h:
-            return
+    def _on_signaled(*_args):
+        reset(h_evt)
+        _bring_window_to_front(win)
 
-        if GetLastError() == ERROR_ALREADY_EXISTS:
-            _request_show_existing_and_exit()
+    try:
+        from PySide6.QtCore import QWinEventNotifier
 
-        _MUTEX_HANDLE = h
-    except Exception:
+        notifier = QWinEventNotifier(h_evt, app)
+        notifier.activated.connect(_on_signaled)
+        notifier.setEnabled(True)
+        app._show_event_notifier = notifier
         return
+    except Exception:
+        pass
+
+    # Fallback: un tick revisa el evento una vez; el reset lo drena completo.
+    def _poll():
+        if wait(h_evt, 0) == WAIT_OBJECT_0:
+            _on_signaled()
+
+    timer = QTimer(app)
+    timer.timeout.connect(_poll)
+    timer.start(_SHOW_EVENT_POLL_MS)
+    app._show_event_timer = timer
 
 
 def _verify_access_before_startup(*, app_icon=None) -> bool:
@@ -275,11 +362,102 @@ def _verify_access_before_startup(*, app_icon=None) -> bool:
     return True
 
 
+def _run_update_check(app_config: dict, events: queue.Queue, out: dict) -> None:
+    """
+    Corre en un hilo aparte: el chequeo es I/O de red y no depende de Qt ni de la DB.
+    Los eventos de UI se encolan para que el hilo principal los pinte.
+    Tras un "sin actualizaciones" reciente el updater responde NO_UPDATE_RECENT
+    sin tocar la red; cualquier estado distinto de UPDATE_STARTED/FAILED_RETRY_LATER
+    solo cierra el diálogo.
+    """
+    try:
+        from .updater import check_for_updates_and_maybe_install
+        out["res"] = check_for_updates_and_maybe_install(
+            app_config,
+            ui=lambda kind, payload: events.put((kind, payload)),
+            parent=None,
+            log=log,
+        )
+    except Exception as e:
+        log.exception("Fallo al ejecutar el chequeo de actualización")
+        out["res"] = {"status": "FAILED_RETRY_LATER", "error": str(e), "retry_in": 0}
+
+
+def _drain_update_events(events: queue.Queue, dlg: UpdateProgressDialog) -> None:
+    while True:
+        try:
+            kind, payload = events.get_nowait()
+        except queue.Empty:
+            return
+        dlg.handle_event(kind, payload)
+
+
+def _wait_update_check(thread: threading.Thread, events: queue.Queue, dlg: UpdateProgressDialog) -> None:
+    while thread.is_alive():
+        _drain_update_events(events, dlg)
+        QApplication.processEvents()
+        thread.join(0.05)
+    _drain_update_events(events, dlg)
+
+
+def _load_startup_catalog() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Abre la DB, sincroniza el Excel y carga el catálogo.
+    Fallos de sync/carga/índice se registran y se abre sin catálogo;
+    fallos de DB/schema se propagan al llamador.
+    """
+    df_productos = df_presentaciones = None
+
+    db_path = resolve_db_path()
+    con = connect(db_path)
+    ensure_schema(con)
+
+    try:
+        with tx(con):
+            sync_catalog_from_excel_to_db(con, DATA_DIR)
+    except Exception as e:
+        log.exception("Falló sync_catalog_from_excel_to_db (se abre sin catálogo): %s", e)
+
+    cur = con.cursor()
+    cur.arraysize = 1024
+    try:
+        df_productos, df_presentaciones = load_catalog_cached(con, os.path.join(DATA_DIR, "_cache"), cursor=cur)
+    except Exception as e:
+        log.exception("Falló load_catalog_cached (se abre sin catálogo): %s", e)
+    finally:
+        cur.close()
+
+    try:
+        idx = LocalSearchIndex(db_path)
+        if ENABLE_AI:
+            # Rebuild rapido (2000 productos es nada). Esto habilita autocompletado smart.
+            idx.ensure_and_rebuild()
+        else:
+            idx.drop_schema()
+    except Exception as e:
+        log.exception("AI index: no se pudo sincronizar: %s", e)
+
+    con.close()
+
+    if df_productos is None:
+        df_productos = pd.DataFrame()
+    if df_presentaciones is None:
+        df_presentaciones = pd.DataFrame()
+    return df_productos, df_presentaciones
+
+
 def run_app():
     set_win_app_id()
-    _single_instance_or_raise_existing()
+    mutex_handle = _single_instance_or_raise_existing()
+
+    # La copia de datos semilla es I/O puro: corre mientras se arma Qt y se
+    # verifica acceso; solo el sync del catálogo necesita que haya terminado.
+    seed_thread = threading.Thread(target=ensure_data_seed_if_empty, name="data-seed", daemon=True)
+    seed_thread.start()
 
     app = QApplication(sys.argv)
+    # El handle vive mientras viva la app; el SO lo libera al salir el proceso.
+    app._mutex_handle = mutex_handle
     apply_modern_theme(app)
 
     app_icon = load_app_icon(COUNTRY_CODE)
@@ -293,12 +471,31 @@ def run_app():
     dlg = UpdateProgressDialog(app_icon=app_icon)
     dlg.show()
 
+    # El chequeo corre en segundo plano mientras se inicializa la DB/catálogo.
+    update_events: queue.Queue = queue.Queue()
+    update_out: dict = {}
+    update_thread = threading.Thread(
+        target=_run_update_check,
+        args=(APP_CONFIG, update_events, update_out),
+        name="update-check",
+        daemon=True,
+    )
+    update_thread.start()
+
+    seed_thread.join()
+
+    # Solo se usan si no hubo catalog_error (ese camino sale antes).
+    df_productos = df_presentaciones = None
+    catalog_error: Exception | None = None
     try:
-        from .updater import check_for_updates_and_maybe_install
-        res = check_for_updates_and_maybe_install(APP_CONFIG, ui=dlg.handle_event, parent=None, log=log)
+        df_productos, df_presentaciones = _load_startup_catalog()
     except Exception as e:
-        log.exception("Fallo al ejecutar el chequeo de actualización")
-        res = {"status": "FAILED_RETRY_LATER", "error": str(e), "retry_in": 0}
+        # Se informa tras el chequeo: una actualización puede corregir la DB.
+        log.exception("Error inicializando DB/Schema")
+        catalog_error = e
+
+    _wait_update_check(update_thread, update_events, dlg)
+    res = update_out.get("res") or {"status": "FAILED_RETRY_LATER", "error": "", "retry_in": 0}
 
     # Si inició update -> cerrar app para que apply_update pueda trabajar
     if res.get("status") == "UPDATE_STARTED":
@@ -351,62 +548,30 @@ def run_app():
         log.exception("No se pudo mostrar el changelog")
 
     # ===== normal arranque =====
-    ensure_data_seed_if_empty()
-
-    df_productos = pd.DataFrame()
-    df_presentaciones = pd.DataFrame()
-
-    try:
-        db_path = resolve_db_path()
-        con = connect(db_path)
-        ensure_schema(con)
-
-        try:
-            with tx(con):
-                sync_catalog_from_excel_to_db(con, DATA_DIR)
-        except Exception as e:
-            log.exception("Falló sync_catalog_from_excel_to_db (se abre sin catálogo): %s", e)
-
-        try:
-            df_productos, df_presentaciones = load_catalog_from_db(con)
-        except Exception as e:
-            log.exception("Falló load_catalog_from_db (se abre sin catálogo): %s", e)
-
-        try:
-            idx = LocalSearchIndex(db_path)
-            if ENABLE_AI:
-                # Rebuild rapido (2000 productos es nada). Esto habilita autocompletado smart.
-                idx.ensure_and_rebuild()
-            else:
-                idx.drop_schema()
-        except Exception as e:
-            log.exception("AI index: no se pudo sincronizar: %s", e)
-
-        con.close()
-
-        if df_productos is None:
-            df_productos = pd.DataFrame()
-        if df_presentaciones is None:
-            df_presentaciones = pd.DataFrame()
-
-        ok_catalog, reason_catalog = validate_products_catalog_df(df_productos)
-        if not ok_catalog:
-            log.warning("Catalogo de productos invalido al iniciar: %s", reason_catalog)
-            QMessageBox.warning(
-                None,
-                "Catalogo invalido",
-                products_update_required_message(df_productos),
-            )
-            df_productos = pd.DataFrame()
-            df_presentaciones = pd.DataFrame()
-    except Exception as e:
-        log.exception("Error inicializando DB/Schema")
-        QMessageBox.critical(None, "Error", f"❌ Error inicializando la base de datos:\n{e}")
+    if catalog_error is not None:
+        QMessageBox.critical(None, "Error", f"❌ Error inicializando la base de datos:\n{catalog_error}")
         sys.exit(1)
 
+    ok_catalog, reason_catalog = validate_products_catalog_df(df_productos)
+    catalog_warning = ""
+    if not ok_catalog:
+        log.warning("Catalogo de productos invalido al iniciar: %s", reason_catalog)
+        catalog_warning = products_update_required_message(df_productos)
+        df_productos = pd.DataFrame()
+        df_presentaciones = pd.DataFrame()
+
     catalog = CatalogManager(df_productos, df_presentaciones)
     events = QuoteEvents()
     win = QuoteHistoryWindow(catalog_manager=catalog, quote_events=events, app_icon=app_icon)
     win.show()
+    _listen_show_requests(app, win)
+
+    if catalog_warning:
+        # No modal: la ventana pinta ya y el aviso queda encima hasta cerrarlo.
+        mb = QMessageBox(QMessageBox.Warning, "Catalogo invalido", catalog_warning, QMessageBox.Ok, win)
+        mb.setWindowModality(Qt.NonModal)
+        mb.setAttribute(Qt.WA_DeleteOnClose, True)
+        mb.show()
+        app._catalog_warning_box = mb
 
     sys.exit(app.exec())
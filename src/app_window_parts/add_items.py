@@ -17,7 +17,6 @@ from ..pricing import (
     factor_total_por_categoria,
     default_price_id_for_product,
 )
-from ..presentations import map_pc_to_bottle_code
 from ..logging_setup import get_logger
 from ..widgets import CustomProductDialog
 
@@ -150,10 +149,10 @@ class AddItemsMixin:
                 base_codes_rel = self._presentation_base_codes(pres)
                 wildcard_cats = self._presentation_wildcard_categories(pres)
                 fixed_component_codes = self._presentation_global_fixed_component_codes()
-                dep = str(pres.get("DEPARTAMENTO") or pres.get("departamento") or "").strip().upper()
-                gen = str(pres.get("GENERO") or pres.get("genero") or "").strip().lower()
-                base_dep = str(base.get("departamento") or base.get("categoria") or "").strip().upper()
-                base_gen = str(base.get("genero") or "").strip().lower()
+                dep = self._presentation_department(pres)
+                gen = self._presentation_gender(pres)
+                base_dep = self._product_department(base)
+                base_gen = self._product_gender(base)
                 essence_cats = {c.upper() for c in CATS}
                 dep_is_presentation = dep in {"", "PRESENTACION", "PRESENTACIONES"}
 
@@ -268,16 +267,14 @@ class AddItemsMixin:
         if self._try_add_presentacion_by_combo_code(cod_u, silent=silent):
             return True
 
+        # 2..4) Una sola búsqueda en _idx_any (ver _index_catalog para la precedencia).
+        kind, hit = self._idx_any.get(cod_u, (None, None))
+
         # 2) Presentación de Hoja 2
         # `PC*` se reserva para productos.
         pres = None
-        if not cod_u.startswith("PC"):
-            pres_candidates = [
-                p
-                for p in self.presentaciones
-                if str(p.get("CODIGO", "")).upper() == cod_u
-                or str(p.get("CODIGO_NORM", "")).upper() == cod_u
-            ]
+        if kind == "pres":
+            pres_candidates = hit
             if pres_candidates:
                 if pres_payload is None:
                     pres = pres_candidates[0]
@@ -300,8 +297,8 @@ class AddItemsMixin:
                     ).strip().upper()
 
                     def _score_pres(p: dict):
-                        p_gen = str(p.get("GENERO") or p.get("genero") or "").strip().lower()
-                        p_dep = str(p.get("DEPARTAMENTO") or p.get("departamento") or "").strip().upper()
+                        p_gen = self._presentation_gender(p)
+                        p_dep = self._presentation_department(p)
                         p_name = str(p.get("NOMBRE") or p.get("nombre") or "").strip().upper()
                         p_stock = float(
                             nz(
@@ -333,10 +330,7 @@ class AddItemsMixin:
             return True
 
         # 3) Producto de catálogo (incluye códigos PC* si existen como producto)
-        prod = next(
-            (p for p in self.productos if str(p.get("id", "")).upper() == cod_u),
-            None,
-        )
+        prod = hit if kind == "prod" else None
         if prod:
             if not listing_allows_products():
                 if not silent:
@@ -347,14 +341,14 @@ class AddItemsMixin:
                     )
                 return False
 
-            if float(nz(prod.get("cantidad_disponible"), 0.0)) <= 0 and not ALLOW_NO_STOCK:
+            if prod["_stock"] <= 0 and not ALLOW_NO_STOCK:
                 if not silent:
                     QMessageBox.warning(
                         self, "Sin stock", "❌ Este producto no tiene stock disponible."
                     )
                 return False
 
-            cat = (prod.get("categoria") or "").upper()
+            cat = prod["_cat_u"]
 
             qty_default = 0.001 if (APP_COUNTRY == "PERU" and cat in CATS) else 1.0
             unit_price = precio_unitario_por_categoria(cat, prod, qty_default)
@@ -379,7 +373,7 @@ class AddItemsMixin:
                 "subtotal_base": subtotal_base,
                 "total": subtotal_base,
                 "observacion": "",
-                "stock_disponible": float(nz(prod.get("cantidad_disponible"), 0.0)),
+                "stock_disponible": prod["_stock"],
                 "precio_override": None,
                 "precio_tier": default_tier,
                 "id_precioventa": default_pid,
@@ -398,28 +392,12 @@ class AddItemsMixin:
                         "El tipo de listado actual no permite Presentaciones.",
                     )
                 return False
-            pc = next(
-                (
-                    p
-                    for p in self._botellas_pc
-                    if str(p.get("id", "")).upper() == cod_u
-                ),
-                None,
-            )
+            pc = hit if kind == "pc" else None
             if pc:
-                bot_code = map_pc_to_bottle_code(str(pc.get("id", "")))
-                bot = next(
-                    (
-                        b
-                        for b in self.productos
-                        if str(b.get("id", "")).upper() == (bot_code or "").upper()
-                        and (b.get("categoria", "").upper() == "BOTELLAS")
-                    ),
-                    None,
-                )
+                bot = self._bottle_for_pc(pc)
                 if (
                     bot is not None
-                    and float(nz(bot.get("cantidad_disponible"), 0.0)) <= 0
+                    and bot["_stock"] <= 0
                     and not ALLOW_NO_STOCK
                 ):
                     if not silent:
@@ -6,6 +6,7 @@ from PySide6.QtWidgets import QCompleter, QApplication
 
 from ..config import listing_allows_products, listing_allows_presentations, ALLOW_NO_STOCK, CATS
 from ..utils import nz
+from ..catalog_manager import product_stock
 
 
 def _is_generic_category_product(prod: dict) -> bool:
@@ -88,13 +89,19 @@ def build_completer_strings(productos, botellas_pc, presentaciones=None):
         sugs.append(t)
 
     if listing_allows_products():
-        for p in productos or []:
-            if (not ALLOW_NO_STOCK) and float(nz(p.get("cantidad_disponible"), 0.0)) <= 0.0:
-                continue
-
-            cat = p.get("categoria", "")
-            gen = p.get("genero", "")
-            _add_sug(f"{p['id']} - {p['nombre']} - {cat}" + (f" - {gen}" if gen else ""))
+        prods = productos or []
+        if not ALLOW_NO_STOCK:
+            prods = [p for p in prods if product_stock(p) > 0.0]
+        for s in [
+            f"{p['id']} - {p['nombre']} - {p.get('categoria', '')}"
+            + (f" - {p['genero']}" if p.get("genero") else "")
+            for p in prods
+        ]:
+            _add_sug(s)
+
+    # (codigo, departamento, producto) de bases no genéricas; se arma una sola vez
+    # y lo comparten todas las presentaciones con comodín de categoría.
+    wildcard_bases: list[tuple[str, str, dict]] | None = None
 
     if listing_allows_presentations():
         for pr in presentaciones or []:
@@ -133,16 +140,25 @@ def build_completer_strings(productos, botellas_pc, presentaciones=None):
 
             base_candidates = []
             if wildcard_categories:
-                for base in productos or []:
-                    if _is_generic_category_product(base):
-                        continue
-                    base_code = str(base.get("id") or "").strip().upper()
-                    if base_code in fixed_component_codes or base_code in set(exact_codes):
-                        continue
-                    base_dep = str(base.get("departamento") or base.get("categoria") or "").strip().upper()
-                    if base_dep not in set(wildcard_categories):
-                        continue
-                    base_candidates.append(base)
+                if wildcard_bases is None:
+                    wildcard_bases = [
+                        (
+                            str(base.get("id") or "").strip().upper(),
+                            str(base.get("departamento") or base.get("categoria") or "").strip().upper(),
+                            base,
+                        )
+                        for base in productos or []
+                        if not _is_generic_category_product(base)
+                    ]
+                exact_set = set(exact_codes)
+                wild_set = set(wildcard_categories)
+                base_candidates = [
+                    base
+                    for base_code, base_dep, base in wildcard_bases
+                    if base_code not in fixed_component_codes
+                    and base_code not in exact_set
+                    and base_dep in wild_set
+                ]
             else:
                 for base_code in exact_codes:
                     base = prod_map.get(base_code)
@@ -155,7 +171,7 @@ def build_completer_strings(productos, botellas_pc, presentaciones=None):
                 if not base_code:
                     continue
 
-                base_stock = float(nz(base.get("cantidad_disponible"), 0.0))
+                base_stock = product_stock(base)
                 if (not ALLOW_NO_STOCK) and base_stock <= 0.0:
                     continue
 
@@ -173,6 +189,75 @@ def build_completer_strings(productos, botellas_pc, presentaciones=None):
     return sugs
 
 
+class SuggestionIndex:
+    """
+    Búsqueda "contiene" (sin distinguir mayúsculas) sobre las sugerencias.
+    Un índice de bigramas reduce los candidatos y solo esos se verifican
+    con `in`; el resultado es el mismo que Qt.MatchContains, en el mismo orden.
+    Se guarda una pila (consulta, aciertos) de lo tecleado: al extender la
+    consulta se filtran solo los aciertos previos (todo lo que contiene "abc"
+    contiene "ab") y al borrar se reutiliza el resultado ya calculado.
+    """
+
+    def __init__(self, sugs: list[str]):
+        self.sugs = sugs
+        self._folded = [s.casefold() for s in sugs]
+        grams: dict[str, list[int]] = {}
+        for i, f in enumerate(self._folded):
+            for g in {f[j : j + 2] for j in range(len(f) - 1)}:
+                grams.setdefault(g, []).append(i)
+        self._grams = grams
+        self._trail: list[tuple[str, list[int]]] = []
+
+    def _candidates(self, q: str) -> range | list[int]:
+        if len(q) < 2:
+            return range(len(self._folded))
+        best: list[int] | None = None
+        for g in {q[j : j + 2] for j in range(len(q) - 1)}:
+            posting = self._grams.get(g)
+            if posting is None:
+                return []
+            if best is None or len(posting) < len(best):
+                best = posting
+        return best or []
+
+    def search(self, text: str) -> list[str]:
+        q = str(text or "").casefold()
+        trail = self._trail
+        while trail and not q.startswith(trail[-1][0]):
+            trail.pop()
+        if not q:
+            return []
+        sugs = self.sugs
+        if trail and trail[-1][0] == q:
+            return [sugs[i] for i in trail[-1][1]]
+
+        folded = self._folded
+        cands = self._candidates(q)
+        if trail and len(trail[-1][1]) < len(cands):
+            cands = trail[-1][1]
+        hits = [i for i in cands if q in folded[i]]
+        trail.append((q, hits))
+        return [sugs[i] for i in hits]
+
+
+# Último índice armado: (flags de listado, productos, presentaciones, índice).
+# Las ventanas comparten las listas de registros del CatalogManager, así que
+# todas reutilizan el mismo índice mientras el catálogo no cambie.
+_suggestion_index_cache: tuple | None = None
+
+
+def cached_suggestion_index(productos, botellas_pc, presentaciones=None) -> SuggestionIndex:
+    global _suggestion_index_cache
+    flags = (listing_allows_products(), listing_allows_presentations(), ALLOW_NO_STOCK)
+    hit = _suggestion_index_cache
+    if hit is not None and hit[0] == flags and hit[1] is productos and hit[2] is presentaciones:
+        return hit[3]
+    index = SuggestionIndex(build_completer_strings(productos, botellas_pc, presentaciones))
+    _suggestion_index_cache = (flags, productos, presentaciones, index)
+    return index
+
+
 class CompleterMixin:
     def _teardown_plain_completer(self):
         comp = getattr(self, "_completer", None)
@@ -188,6 +273,7 @@ class CompleterMixin:
                 pass
         self._completer = None
         self._sug_model = None
+        self._sug_index = None
 
     def _teardown_ai_completers(self):
         self._teardown_ai_product_completer()
@@ -296,13 +382,17 @@ class CompleterMixin:
                 pass
             return
 
-        self._sug_model = QStringListModel(
-            build_completer_strings(self.productos, self._botellas_pc, self.presentaciones)
-        )
+        # El índice de sugerencias se arma al primer textEdited (ver _filter_product_suggestions).
+        self._sug_index = None
+        self._sug_model = QStringListModel()
         self._completer = QCompleter(self._sug_model, self)
         self._completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self._completer.setFilterMode(Qt.MatchContains)
+        # El filtrado lo hace _sug_index; Qt solo muestra el modelo ya filtrado.
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
         self.entry_producto.setCompleter(self._completer)
+        if not getattr(self, "_sug_filter_connected", False):
+            self.entry_producto.textEdited.connect(self._filter_product_suggestions)
+            self._sug_filter_connected = True
 
         def add_from_completion(text: str):
             if self._ignore_completer:
@@ -317,6 +407,16 @@ class CompleterMixin:
 
         self._completer.activated[str].connect(add_from_completion)
 
+    def _filter_product_suggestions(self, text: str):
+        model = getattr(self, "_sug_model", None)
+        if getattr(self, "_completer", None) is None or model is None:
+            return
+        index = getattr(self, "_sug_index", None)
+        if index is None:
+            index = cached_suggestion_index(self.productos, self._botellas_pc, self.presentaciones)
+            self._sug_index = index
+        model.setStringList(index.search(text))
+
     def _on_return_pressed(self):
         popup = self._completer.popup() if self._completer else None
         if popup and popup.isVisible():
@@ -1,8 +1,6 @@
 # src/app_window_parts/currency.py
 from __future__ import annotations
 
-from PySide6.QtCore import Qt
-
 from ..config import (
     APP_CURRENCY,
     APP_COUNTRY,
@@ -27,21 +25,17 @@ class CurrencyMixin:
     """
 
     def _load_exchange_rate_file(self) -> dict[str, float]:
+        con = None
         try:
-            db_path = resolve_db_path()
-            con = connect(db_path)
+            con = connect(resolve_db_path())
             ensure_schema(con)
-            rates = load_rates(con, self.base_currency)
-            con.close()
-            out: dict[str, float] = {}
-            for k, v in (rates or {}).items():
-                try:
-                    out[str(k).upper()] = float(v)
-                except Exception:
-                    continue
-            return out
+            # load_rates ya devuelve {MONEDA: float}; no hace falta re-normalizar.
+            return load_rates(con, self.base_currency)
         except Exception:
             return {}
+        finally:
+            if con is not None:
+                con.close()
 
     def _save_exchange_rate_file(self, rates: dict[str, float] | None = None) -> None:
         payload = rates if rates is not None else (getattr(self, "_rates", None) or {})
@@ -66,11 +60,30 @@ class CurrencyMixin:
         except Exception:
             pass
 
-    def _update_currency_label(self):
+    def _rates_label_text(self, base: str) -> str:
+        # _rates siempre se reemplaza (nunca se muta): basta comparar identidad.
+        rates = self._rates
+        memo = getattr(self, "_rates_label_memo", None)
+        if memo is not None and memo[0] is rates and memo[1] == base:
+            return memo[2]
+
+        parts = []
+        for code, val in sorted(rates.items()):
+            try:
+                parts.append(f"{base}→{code}: {float(val):.4f}")
+            except Exception:
+                continue
+        txt = "; ".join(parts) if parts else "sin configurar"
+        self._rates_label_memo = (rates, base, txt)
+        return txt
+
+    def _update_currency_label(self, cur: str | None = None, rate_ctx: float | None = None):
+        """Si no se pasan cur/rate_ctx, se leen de get_currency_context()."""
         if not hasattr(self, "lbl_moneda"):
             return
 
-        cur, _sec_principal, rate_ctx = get_currency_context()
+        if cur is None or rate_ctx is None:
+            cur, _sec_principal, rate_ctx = get_currency_context()
         base = self.base_currency
         cur = (cur or "").upper()
 
@@ -81,14 +94,7 @@ class CurrencyMixin:
 
         if cur == base:
             if getattr(self, "_rates", None):
-                parts = []
-                for code, val in sorted(self._rates.items()):
-                    try:
-                        parts.append(f"{base}→{code}: {float(val):.4f}")
-                    except Exception:
-                        continue
-                txt_rates = "; ".join(parts) if parts else "sin configurar"
-                txt = f"Moneda: {base} (tasas {txt_rates})"
+                txt = f"Moneda: {base} (tasas {self._rates_label_text(base)})"
             else:
                 txt = f"Moneda: {base} (tasas secundarias sin configurar)"
         else:
@@ -166,13 +172,11 @@ class CurrencyMixin:
                 r = 1.0
             set_currency_context(selected, r)
 
-        self._update_currency_label()
+        cur_new, _sec2, r_new = get_currency_context()
+        self._update_currency_label(cur_new, r_new)
 
         # refrescar tabla
-        if self.model.rowCount() > 0:
-            top = self.model.index(0, 0)
-            bottom = self.model.index(self.model.rowCount() - 1, self.model.columnCount() - 1)
-            self.model.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
+        self.model.refresh_money_columns()
 
         # ✅ disparar rates_updated para que otras ventanas recarguen tasas
         qe = getattr(self, "_quote_events", None)
@@ -182,7 +186,6 @@ class CurrencyMixin:
             except Exception:
                 pass
 
-        cur_new, _sec2, r_new = get_currency_context()
         log.info(
             "Cambio de moneda: %s → %s (rate=%s, tasas=%s)",
             old_currency,
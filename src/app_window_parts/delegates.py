@@ -24,10 +24,13 @@ class QuantityDelegate(QStyledItemDelegate):
     Evita que el usuario escriba letras directamente.
     """
 
+    # Compilado una vez; cada editor solo crea su validador.
+    _QTY_RX = QRegularExpression(r"^[0-9.,-]*$")
+    _QTY_RX.optimize()
+
     def createEditor(self, parent, option, index):
         editor = _QuantityLineEdit(parent)
-        rx = QRegularExpression(r"^[0-9.,-]*$")
-        validator = QRegularExpressionValidator(rx, editor)
+        validator = QRegularExpressionValidator(self._QTY_RX, editor)
         editor.setValidator(validator)
         editor.setAlignment(Qt.AlignCenter)
         editor.setMaxLength(18)
@@ -20,6 +20,8 @@ from ..config import (
 )
 from ..logging_setup import get_logger
 from ..db_path import resolve_db_path
+from ..catalog_manager import presentation_records, product_records
+from ..presentations import extract_ml_from_text, map_pc_to_bottle_code
 from ..utils import nz
 
 from .ui import UiMixin
@@ -66,12 +68,16 @@ class SistemaCotizaciones(
         self._catalog_manager = catalog_manager
         self._quote_events = quote_events
 
-        self.productos = df_productos.to_dict("records") if df_productos is not None else []
-        self.presentaciones = df_presentaciones.to_dict("records") if df_presentaciones is not None else []
+        self.productos = self._catalog_records(df_productos, product_records)
+        self.presentaciones = self._catalog_records(df_presentaciones, presentation_records)
         self._presentation_rel_cache = {}
         self._presentation_product_map_cache = None
         self._presentation_generic_categories_cache = None
         self._presentation_fixed_component_codes_cache = None
+        self._presentation_base_dept_cache = None
+        self._presentation_base_dept_gen_cache = None
+        self._presentation_ml_index_cache = None
+        self._presentation_ml_groups_cache = None
         self.items: list[dict] = []
         self._suppress_next_return = False
         self._ignore_completer = False
@@ -86,13 +92,7 @@ class SistemaCotizaciones(
         self._rates: dict[str, float] = self._load_exchange_rate_file()  # <- DB
         set_currency_context(self.base_currency, 1.0)
 
-        # PCs visibles: códigos que empiezan por "PC" y categoría "OTROS"
-        self._botellas_pc = [
-            p
-            for p in (self.productos or [])
-            if str(p.get("id", "")).upper().startswith("PC")
-            and (p.get("categoria", "").upper() == "OTROS")
-        ]
+        self._index_catalog()
 
         log.info(
             "Ventana iniciada. productos=%d presentaciones=%d botellasPC=%d tasas=%s",
@@ -107,7 +107,7 @@ class SistemaCotizaciones(
         self._build_ui()
         self._restore_window_state()
         self.entry_cliente.textChanged.connect(self._update_title_with_client)
-        self._update_title_with_client(self.entry_cliente.text())
+        self._apply_client_title()
         self._build_completer()
         self.set_recommendations_enabled(self._recommendations_enabled)
 
@@ -133,6 +133,70 @@ class SistemaCotizaciones(
             except Exception:
                 pass
 
+    def _index_catalog(self) -> None:
+        """
+        Índices derivados del catálogo. Los registros ya traen sus claves
+        normalizadas (ver catalog_manager.product_records) y no se modifican:
+        se comparten entre ventanas.
+        """
+        # Presentación por CODIGO/CODIGO_NORM (en mayúsculas), en orden de catálogo.
+        idx_pres: dict[str, list[dict]] = {}
+        for p in (self.presentaciones or []):
+            for key in {str(p.get("CODIGO", "")).upper(), str(p.get("CODIGO_NORM", "")).upper()}:
+                idx_pres.setdefault(key, []).append(p)
+        # Código -> (tipo, destino) con la misma precedencia que _agregar_por_codigo:
+        # presentación (`PC*` se reserva para productos) > producto > PC legacy.
+        idx_any: dict[str, tuple[str, object]] = {
+            code: ("pres", cands) for code, cands in idx_pres.items() if not code.startswith("PC")
+        }
+        self._idx_any = idx_any
+
+        prods = self.productos or []
+        if not prods:
+            self._botellas_pc = []
+            self._idx_bottles = {}
+            self._pc_to_bottle = {}
+            self._pc_bottles_by_ml = {}
+            return
+
+        ids_u = [p["_id_u"] for p in prods]
+        cats_u = [p["_cat_u"] for p in prods]
+
+        # PCs visibles: códigos que empiezan por "PC" y categoría "OTROS"
+        pc_pos = [
+            i for i, (id_u, cat_u) in enumerate(zip(ids_u, cats_u))
+            if cat_u == "OTROS" and id_u.startswith("PC")
+        ]
+        self._botellas_pc = [prods[i] for i in pc_pos]
+
+        # Índices id (en mayúsculas) -> primer registro, como las búsquedas lineales previas.
+        for id_u, p in zip(ids_u, prods):
+            idx_any.setdefault(id_u, ("prod", p))
+        for i in pc_pos:
+            idx_any.setdefault(ids_u[i], ("pc", prods[i]))
+        bottle_pos = [i for i, cat_u in enumerate(cats_u) if cat_u == "BOTELLAS"]
+        self._idx_bottles = {ids_u[i]: prods[i] for i in reversed(bottle_pos)}
+        # PC visible -> registro de su botella (o None), resuelto una sola vez.
+        self._pc_to_bottle = {
+            pc["_id_u"]: self._idx_bottles.get(map_pc_to_bottle_code(pc["_id_u"]) or "")
+            for pc in self._botellas_pc
+        }
+        # ml -> [(PC, botella)] en orden de _botellas_pc (ml de la botella, o del PC).
+        pc_bottles_by_ml: dict[int, list[tuple[dict, dict]]] = {}
+        for pc in self._botellas_pc:
+            bot = self._pc_to_bottle[pc["_id_u"]]
+            if not bot:
+                continue
+            ml = extract_ml_from_text(bot.get("nombre", "")) or extract_ml_from_text(pc.get("nombre", ""))
+            pc_bottles_by_ml.setdefault(ml, []).append((pc, bot))
+        self._pc_bottles_by_ml = pc_bottles_by_ml
+
+    def _catalog_records(self, df: pd.DataFrame | None, build) -> list[dict]:
+        mgr = self._catalog_manager
+        if mgr is not None:
+            return mgr.records_for(df, build)
+        return build(df)
+
     def _attach_inline_assistant(self):
         if getattr(self, "_assistant", None) is not None:
             return
@@ -194,10 +258,7 @@ class SistemaCotizaciones(
             self._update_currency_label()
         except Exception:
             pass
-        if self.model.rowCount() > 0:
-            top = self.model.index(0, 0)
-            bottom = self.model.index(self.model.rowCount() - 1, self.model.columnCount() - 1)
-            self.model.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
+        self.model.refresh_money_columns()
 
     def set_recommendations_enabled(self, enabled: bool):
         self._recommendations_enabled = bool(enabled)
@@ -208,18 +269,17 @@ class SistemaCotizaciones(
 
     def _on_catalog_updated(self, df_productos: pd.DataFrame, df_presentaciones: pd.DataFrame):
         try:
-            self.productos = df_productos.to_dict("records") if df_productos is not None else []
-            self.presentaciones = df_presentaciones.to_dict("records") if df_presentaciones is not None else []
+            self.productos = self._catalog_records(df_productos, product_records)
+            self.presentaciones = self._catalog_records(df_presentaciones, presentation_records)
             self._presentation_rel_cache = {}
             self._presentation_product_map_cache = None
             self._presentation_generic_categories_cache = None
             self._presentation_fixed_component_codes_cache = None
-            self._botellas_pc = [
-                p
-                for p in (self.productos or [])
-                if str(p.get("id", "")).upper().startswith("PC")
-                and (p.get("categoria", "").upper() == "OTROS")
-            ]
+            self._presentation_base_dept_cache = None
+            self._presentation_base_dept_gen_cache = None
+            self._presentation_ml_index_cache = None
+            self._presentation_ml_groups_cache = None
+            self._index_catalog()
 
             try:
                 self._build_completer()
@@ -250,6 +310,7 @@ class SistemaCotizaciones(
                     it["_prod"] = prod
                     if prod.get("categoria"):
                         it["categoria"] = prod.get("categoria")
+                        it["_cat_u"] = str(it["categoria"]).upper()
                     if "cantidad_disponible" in prod:
                         it["stock_disponible"] = prod.get("cantidad_disponible")
 
@@ -411,6 +472,7 @@ class SistemaCotizaciones(
                             return None
             return None
 
+        new_items: list[dict] = []
         for it in (payload.get("items_base") or []):
             codigo = str(it.get("codigo") or "").strip()
             cat_u_in = str(it.get("categoria") or "").strip().upper()
@@ -449,7 +511,9 @@ class SistemaCotizaciones(
             item.setdefault("descuento_monto", 0.0)
 
             # Al reabrir desde histórico, conservamos el snapshot guardado.
-            self.model.add_item(item)
+            new_items.append(item)
+
+        self.model.add_items(new_items)
 
     @staticmethod
     def _parse_int(value, default: int = 0) -> int:
@@ -528,6 +592,12 @@ class SistemaCotizaciones(
                     pass
 
     def closeEvent(self, event):
+        # Con un PDF en curso el correlativo ya está reservado: se cierra recién
+        # cuando la cotización quede guardada en el histórico (ver pdf_actions).
+        if getattr(self, "_pdf_job", None) is not None:
+            self._close_after_pdf_job = True
+            event.ignore()
+            return
         try:
             self._save_window_state()
         except Exception:
@@ -42,6 +42,14 @@ INLINE_PRICE_TIER_REVERSE = {
 }
 
 
+def _item_cat_u(item: dict) -> str:
+    # add_item deja la categoría normalizada en "_cat_u"; los previews no pasan por ahí.
+    cat = item.get("_cat_u")
+    if cat is None:
+        cat = (item.get("categoria") or "").upper()
+    return cat
+
+
 def _is_service_category(cat: str) -> bool:
     return str(cat or "").strip().upper() == "SERVICIO"
 
@@ -201,6 +209,8 @@ def _parse_qty_peru_cats(value) -> float:
 
 class ItemsModel(QAbstractTableModel):
     HEADERS = ["Código", "Producto", "Descuento", "Cantidad", "Precio Unitario", "Subtotal"]
+    # La observación solo se muestra (y edita) en la columna Producto.
+    OBS_COL = 1
 
     item_added = Signal(int)
     toast_requested = Signal(str)
@@ -211,6 +221,23 @@ class ItemsModel(QAbstractTableModel):
         self._py_cash_mode = False
         self._recs_preview: list[dict] = []
         self._code_edit_handler = None
+        # Estilo de las filas de vista previa: una sola instancia para todas las celdas.
+        self._preview_brush = QBrush(Qt.darkGray)
+        self._preview_font = QFont()
+        self._preview_font.setItalic(True)
+        # Suma de "total" (moneda base); se invalida con cualquier cambio notificado.
+        self._total_cache: float | None = None
+        for sig in (self.dataChanged, self.rowsInserted, self.rowsRemoved, self.modelReset, self.layoutChanged):
+            sig.connect(self._invalidate_total)
+
+    def _invalidate_total(self, *_args) -> None:
+        self._total_cache = None
+
+    def total_base(self) -> float:
+        """Suma de los totales de los ítems (sin filas de vista previa)."""
+        if self._total_cache is None:
+            self._total_cache = float(sum(nz(it.get("total")) for it in self._items))
+        return self._total_cache
 
     def set_code_edit_handler(self, handler) -> None:
         self._code_edit_handler = handler if callable(handler) else None
@@ -428,7 +455,7 @@ class ItemsModel(QAbstractTableModel):
             f = 0.0
         if f > 0:
             return f
-        cat = (it.get("categoria") or "").upper()
+        cat = _item_cat_u(it)
         return float(factor_total_por_categoria(cat, it))
 
     def _compute_subtotal_base(self, it: dict, unit_price: float | None = None) -> float:
@@ -468,7 +495,7 @@ class ItemsModel(QAbstractTableModel):
         return pct
 
     def _maybe_snap_override_to_tier(self, it: dict, unit_price: float) -> float:
-        cat = (it.get("categoria") or "").upper()
+        cat = _item_cat_u(it)
         prod = it.get("_prod", {}) or {}
         if _is_service_category(cat):
             it["id_precioventa"] = PRICE_ID_PERSONALIZADO
@@ -646,6 +673,21 @@ class ItemsModel(QAbstractTableModel):
     def columnCount(self, parent=QModelIndex()) -> int:
         return len(self.HEADERS)
 
+    # Columnas cuyo texto depende de la moneda/tasa: Descuento (monto), Precio, Subtotal.
+    _MONEY_COLUMN_SPANS = ((2, 2), (4, 5))
+
+    def refresh_money_columns(self) -> None:
+        """Repinta solo las columnas de montos tras un cambio de moneda o tasas."""
+        n = self.rowCount()
+        if n <= 0:
+            return
+        for first, last in self._MONEY_COLUMN_SPANS:
+            self.dataChanged.emit(self.index(0, first), self.index(n - 1, last), [Qt.DisplayRole])
+
+    def refresh_observation(self, row: int) -> None:
+        ix = self.index(row, self.OBS_COL)
+        self.dataChanged.emit(ix, ix, [Qt.DisplayRole, Qt.EditRole])
+
     def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role != Qt.DisplayRole:
             return None
@@ -669,7 +711,7 @@ class ItemsModel(QAbstractTableModel):
             col == 4
             and (
                 CAN_EDIT_UNIT_PRICE
-                or (self._items[row].get("categoria") or "").upper() in ("SERVICIO", "BOTELLAS")
+                or _item_cat_u(self._items[row]) in ("SERVICIO", "BOTELLAS")
             )
         )
 
@@ -692,11 +734,9 @@ class ItemsModel(QAbstractTableModel):
 
         if is_preview:
             if role == Qt.ForegroundRole:
-                return QBrush(Qt.darkGray)
+                return self._preview_brush
             if role == Qt.FontRole:
-                f = QFont()
-                f.setItalic(True)
-                return f
+                return self._preview_font
             if role == Qt.ToolTipRole:
                 rsn = str(it.get("_rec_reason") or "").strip()
                 sc = float(nz(it.get("_rec_score"), 0.0))
@@ -727,7 +767,7 @@ class ItemsModel(QAbstractTableModel):
                     return f"-{fmt_money_ui(convert_from_base(d_monto))}"
                 return "—"
             elif col == 3:
-                cat = (it.get("categoria") or "").upper()
+                cat = _item_cat_u(it)
                 if APP_COUNTRY == "PERU" and cat in CATS:
                     try:
                         return f"{float(nz(it.get('cantidad'), 0.0)):.3f}"
@@ -767,7 +807,7 @@ class ItemsModel(QAbstractTableModel):
                 return ""
 
             if col == 3:
-                cat = (it.get("categoria") or "").upper()
+                cat = _item_cat_u(it)
                 if APP_COUNTRY == "PERU" and (cat in CATS):
                     try:
                         return f"{float(nz(it.get('cantidad'), 0.0)):.3f}"
@@ -778,7 +818,7 @@ class ItemsModel(QAbstractTableModel):
                 except Exception:
                     return "1"
 
-            if col == 4 and (CAN_EDIT_UNIT_PRICE or (it.get("categoria") or "").upper() in ("SERVICIO", "BOTELLAS")):
+            if col == 4 and (CAN_EDIT_UNIT_PRICE or _item_cat_u(it) in ("SERVICIO", "BOTELLAS")):
                 return self._price_tier_token_for_edit(it)
 
         return None
@@ -787,7 +827,7 @@ class ItemsModel(QAbstractTableModel):
         self._normalize_discount_and_totals(it, unit_price)
 
     def _recalc_price_for_qty(self, it: dict):
-        cat = (it.get("categoria") or "").upper()
+        cat = _item_cat_u(it)
         qty = float(nz(it.get("cantidad"), 0.0))
         prod = it.get("_prod", {}) or {}
 
@@ -848,11 +888,9 @@ class ItemsModel(QAbstractTableModel):
             except Exception:
                 return False
 
-        if col == 1:
+        if col == self.OBS_COL:
             it["observacion"] = str(value or "").strip()
-            top = self.index(row, 0)
-            bottom = self.index(row, self.columnCount() - 1)
-            self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
+            self.refresh_observation(row)
             return True
 
         if col == 2:
@@ -948,7 +986,7 @@ class ItemsModel(QAbstractTableModel):
 
         if col == 3:
             old_qty = float(nz(it.get("cantidad"), 0.0))
-            cat = (it.get("categoria") or "").upper()
+            cat = _item_cat_u(it)
             txt_raw = str(value).strip()
 
             try:
@@ -976,69 +1014,121 @@ class ItemsModel(QAbstractTableModel):
             self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
             return True
 
-        if col == 4 and (CAN_EDIT_UNIT_PRICE or (it.get("categoria") or "").upper() in ("SERVICIO", "BOTELLAS")):
-            cat = (it.get("categoria") or "").upper()
-            prod = it.get("_prod", {}) or {}
-            qty = float(nz(it.get("cantidad"), 0.0))
-            if not isinstance(value, dict):
-                token = str(value or "").strip().lower()
-                tier = INLINE_PRICE_TIER_MAP.get(token)
-                if not tier:
-                    return False
-                value = {"mode": "tier", "tier": tier}
+        if col == 4:
+            if not self._apply_price_edit(it, value):
+                return False
+            top = self.index(row, 0)
+            bottom = self.index(row, self.columnCount() - 1)
+            self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
+            return True
 
-            mode = (value.get("mode") or "").lower()
-            if mode == "custom":
-                new_price = float(nz(value.get("price"), 0.0))
-                if new_price < 0:
-                    new_price = 0.0
+        return False
 
+    def _apply_price_edit(self, it: dict, value) -> bool:
+        """Aplica una edición de precio (columna 4) al ítem, sin emitir señales."""
+        cat = _item_cat_u(it)
+        if not (CAN_EDIT_UNIT_PRICE or cat in ("SERVICIO", "BOTELLAS")):
+            return False
+        prod = it.get("_prod", {}) or {}
+        qty = float(nz(it.get("cantidad"), 0.0))
+        if not isinstance(value, dict):
+            token = str(value or "").strip().lower()
+            tier = INLINE_PRICE_TIER_MAP.get(token)
+            if not tier:
+                return False
+            value = {"mode": "tier", "tier": tier}
+
+        mode = (value.get("mode") or "").lower()
+        if mode == "custom":
+            new_price = float(nz(value.get("price"), 0.0))
+            if new_price < 0:
+                new_price = 0.0
+
+            if _is_service_category(cat):
+                it["precio_override"] = new_price
+                it["precio_tier"] = None
+                it["id_precioventa"] = PRICE_ID_PERSONALIZADO
+                self._apply_price_and_total(it, new_price)
+            else:
+                tier, tier_price = _closest_allowed_tier(prod, new_price)
+                if tier_price <= 0:
+                    tier_price = float(precio_unitario_por_categoria(cat, prod, qty) or 0.0)
+                it["precio_override"] = None
+                it["precio_tier"] = tier
+                it["id_precioventa"] = _price_id_from_tier(tier)
+                self._apply_price_and_total(it, tier_price)
+
+        elif mode == "tier":
+            tier_raw = (value.get("tier") or "")
+            tier = _norm_tier_name(str(tier_raw))
+
+            if tier in ("base", "unitario", "oferta", "minimo", "maximo"):
                 if _is_service_category(cat):
-                    it["precio_override"] = new_price
+                    tier_price = float(_price_from_tier(prod, tier) or nz(it.get("precio"), 0.0))
+                    it["precio_override"] = tier_price
                     it["precio_tier"] = None
                     it["id_precioventa"] = PRICE_ID_PERSONALIZADO
-                    self._apply_price_and_total(it, new_price)
+                    self._apply_price_and_total(it, tier_price)
                 else:
-                    tier, tier_price = _closest_allowed_tier(prod, new_price)
-                    if tier_price <= 0:
-                        tier_price = float(precio_unitario_por_categoria(cat, prod, qty) or 0.0)
                     it["precio_override"] = None
-                    it["precio_tier"] = tier
-                    it["id_precioventa"] = _price_id_from_tier(tier)
-                    self._apply_price_and_total(it, tier_price)
-
-            elif mode == "tier":
-                tier_raw = (value.get("tier") or "")
-                tier = _norm_tier_name(str(tier_raw))
-
-                if tier in ("base", "unitario", "oferta", "minimo", "maximo"):
-                    if _is_service_category(cat):
-                        tier_price = float(_price_from_tier(prod, tier) or nz(it.get("precio"), 0.0))
-                        it["precio_override"] = tier_price
-                        it["precio_tier"] = None
-                        it["id_precioventa"] = PRICE_ID_PERSONALIZADO
-                        self._apply_price_and_total(it, tier_price)
+                    if tier == "base":
+                        it["id_precioventa"] = _default_price_id_from_prod(prod)
                     else:
-                        it["precio_override"] = None
-                        if tier == "base":
-                            it["id_precioventa"] = _default_price_id_from_prod(prod)
-                        else:
-                            it["id_precioventa"] = _price_id_from_tier(tier)
-                        it["precio_tier"] = _tier_from_price_id(it["id_precioventa"])
-                        self._recalc_price_for_qty(it)
-                else:
-                    return False
+                        it["id_precioventa"] = _price_id_from_tier(tier)
+                    it["precio_tier"] = _tier_from_price_id(it["id_precioventa"])
+                    self._recalc_price_for_qty(it)
             else:
                 return False
+        else:
+            return False
+        return True
+
+    def set_prices(self, changes: dict[int, dict]) -> None:
+        """
+        Aplica ediciones de precio {fila: valor} (como setData en la columna 4)
+        con un único dataChanged para todas las filas modificadas.
+        """
+        changed = [
+            row
+            for row, value in changes.items()
+            if 0 <= row < len(self._items)
+            and not self._is_preview_row(row)
+            and self._apply_price_edit(self._items[row], value)
+        ]
+        if not changed:
+            return
+        top = self.index(min(changed), 0)
+        bottom = self.index(max(changed), self.columnCount() - 1)
+        self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
 
-            top = self.index(row, 0)
-            bottom = self.index(row, self.columnCount() - 1)
-            self.dataChanged.emit(top, bottom, [Qt.DisplayRole, Qt.EditRole])
-            return True
+    def add_item(self, item: dict):
+        self._prepare_new_item(item)
 
-        return False
+        self.beginInsertRows(QModelIndex(), len(self._items), len(self._items))
+        self._items.append(item)
+        self.endInsertRows()
+        log.debug("Item agregado: %s", item.get("codigo"))
+        self.item_added.emit(len(self._items) - 1)
 
-    def add_item(self, item: dict):
+    def add_items(self, items) -> None:
+        """
+        Igual que add_item para varios ítems, con una sola inserción de filas
+        (y un solo item_added, por la última fila).
+        """
+        new_items = list(items or [])
+        if not new_items:
+            return
+        for item in new_items:
+            self._prepare_new_item(item)
+
+        start = len(self._items)
+        self.beginInsertRows(QModelIndex(), start, start + len(new_items) - 1)
+        self._items.extend(new_items)
+        self.endInsertRows()
+        log.debug("Items agregados: %d", len(new_items))
+        self.item_added.emit(len(self._items) - 1)
+
+    def _prepare_new_item(self, item: dict) -> None:
         if "precio_override" not in item:
             item["precio_override"] = None
         if "precio_tier" not in item:
@@ -1053,6 +1143,7 @@ class ItemsModel(QAbstractTableModel):
             item["descuento_monto"] = 0.0
 
         cat = (item.get("categoria") or "").upper()
+        item["_cat_u"] = cat
         if _is_service_category(cat):
             item["id_precioventa"] = PRICE_ID_PERSONALIZADO
             item["precio_tier"] = None
@@ -1073,7 +1164,7 @@ class ItemsModel(QAbstractTableModel):
         if "factor_total" not in item:
             try:
                 item["factor_total"] = float(
-                    factor_total_por_categoria((item.get("categoria") or "").upper(), item)
+                    factor_total_por_categoria(cat, item)
                 )
             except Exception:
                 item["factor_total"] = 1.0
@@ -1085,18 +1176,21 @@ class ItemsModel(QAbstractTableModel):
 
         self._normalize_discount_and_totals(item, unit_price)
 
-        self.beginInsertRows(QModelIndex(), len(self._items), len(self._items))
-        self._items.append(item)
-        self.endInsertRows()
-        log.debug("Item agregado: %s", item.get("codigo"))
-        self.item_added.emit(len(self._items) - 1)
-
     def remove_rows(self, rows: list[int]):
-        for r in sorted(set(rows), reverse=True):
-            if r >= len(self._items):
-                continue
-            if 0 <= r < len(self._items):
-                self.beginRemoveRows(QModelIndex(), r, r)
-                removed = self._items.pop(r)
-                self.endRemoveRows()
-                log.debug("Item removido: %s", removed.get("codigo"))
+        # Tramos contiguos, de abajo hacia arriba: un begin/endRemoveRows por tramo
+        # (limpiar el formulario es un único tramo).
+        n = len(self._items)
+        valid = sorted({r for r in rows if 0 <= r < n}, reverse=True)
+        i = 0
+        while i < len(valid):
+            last = first = valid[i]
+            i += 1
+            while i < len(valid) and valid[i] == first - 1:
+                first = valid[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            removed = self._items[first : last + 1]
+            del self._items[first : last + 1]
+            self.endRemoveRows()
+            for it in removed:
+                log.debug("Item removido: %s", it.get("codigo"))
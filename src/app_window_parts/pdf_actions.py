@@ -3,11 +3,10 @@ from __future__ import annotations
 
 import os
 import datetime
-from copy import deepcopy
 
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtGui import QDesktopServices
-from PySide6.QtCore import QUrl, QTimer
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QUrl, Signal
 
 from ..paths import COTIZACIONES_DIR, resolve_country_asset
 from ..config import APP_COUNTRY, COUNTRY_CODE, convert_from_base, get_currency_context
@@ -28,11 +27,47 @@ from .ticket_actions import generar_ticket_para_cotizacion
 
 log = get_logger(__name__)
 
+# Ruta absoluta del manual ya encontrado; si falta se vuelve a buscar en cada clic
+# (el aviso invita a copiarlo y reintentar sin reiniciar la app).
+_manual_path: str | None = None
+
+# COTIZACIONES_DIR ya es absoluta y no cambia durante la sesión.
+_COT_DIR_URL = QUrl.fromLocalFile(COTIZACIONES_DIR)
+
+
+class PdfJobSignals(QObject):
+    finished = Signal(object, str)  # ruta (None si falló), error
+
+
+class PdfJob(QRunnable):
+    """Renderiza el PDF de la cotización fuera del hilo de la UI."""
+
+    def __init__(self, datos: dict, quote_code: str):
+        super().__init__()
+        self.setAutoDelete(True)
+        self.datos = datos
+        self.quote_code = quote_code
+        self.signals = PdfJobSignals()
+
+    def run(self):
+        try:
+            ruta = generar_pdf(self.datos, fixed_quote_no=self.quote_code)
+        except Exception as e:
+            log.exception("Error al generar PDF")
+            self.signals.finished.emit(None, str(e))
+            return
+        self.signals.finished.emit(ruta, "")
+
 
 class PdfActionsMixin:
     def abrir_manual(self):
-        ruta = resolve_country_asset("manual_usuario_sistema.pdf", COUNTRY_CODE)
+        global _manual_path
+        ruta = _manual_path
         if not ruta or not os.path.exists(ruta):
+            ruta = resolve_country_asset("manual_usuario_sistema.pdf", COUNTRY_CODE)
+            _manual_path = os.path.abspath(ruta) if ruta and os.path.exists(ruta) else None
+            ruta = _manual_path
+        if not ruta:
             QMessageBox.warning(
                 self,
                 "Manual no encontrado",
@@ -42,7 +77,7 @@ class PdfActionsMixin:
                 "e inténtalo de nuevo.",
             )
             return
-        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(ruta)))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(ruta))
 
     def abrir_listado_productos(self):
         dlg = ListadoProductosDialog(
@@ -60,40 +95,78 @@ class PdfActionsMixin:
         dlg.move(x, y)
         dlg.exec()
 
-    def previsualizar_datos(self):
-        c = self.entry_cliente.text()
-        ci = self.entry_cedula.text()
-        t = self.entry_telefono.text()
-        d = self.entry_direccion.text()
-        e = self.entry_email.text()
-        items = self.items
-        if not all([c, ci, t, d, e]):
+    def _read_cliente(self) -> tuple[str, str, str, str, str]:
+        """(cliente, documento, teléfono, dirección, email) tal como están en el formulario."""
+        return (
+            self.entry_cliente.text(),
+            self.entry_cedula.text(),
+            self.entry_telefono.text(),
+            self.entry_direccion.text(),
+            self.entry_email.text(),
+        )
+
+    def _validate_for_output(
+        self, empty_msg: str = "❌ Faltan productos en la cotización"
+    ) -> tuple[tuple[str, str, str, str, str], str] | None:
+        """
+        Validaciones comunes a previsualizar y generar. Devuelve (datos del cliente,
+        tipo de documento) o None tras avisar al usuario (`empty_msg` si no hay ítems).
+        """
+        cliente = self._read_cliente()
+        c, ci, t, d, e = cliente
+        if not (c and ci and t and d and e):
             QMessageBox.warning(self, "Advertencia", "❌ Faltan datos del cliente")
-            return
-        ok_doc, msg_doc, _tipo_doc = self._validate_doc_phone_values(ci, t, direccion=d, email=e)
+            return None
+        ok_doc, msg_doc, tipo_doc = self._validate_doc_phone_values(ci, t, direccion=d, email=e)
         if not ok_doc:
             QMessageBox.warning(self, "Advertencia", msg_doc)
-            return
-        total_items = sum(nz(i.get("total")) for i in items) if items else 0.0
-        if not items or total_items <= 0.0:
-            QMessageBox.warning(self, "Advertencia", "❌ Faltan productos en la cotización")
-            return
+            return None
+        # total_base() está cacheado en el modelo: no recorre los ítems si nada cambió.
+        if not self.items or self.model.total_base() <= 0.0:
+            QMessageBox.warning(self, "Advertencia", empty_msg)
+            return None
+        return cliente, tipo_doc
 
-        show_preview_dialog(self, self._app_icon, c, ci, t, items)
+    def previsualizar_datos(self):
+        ok = self._validate_for_output()
+        if ok is None:
+            return
+        c, ci, t, _d, _e = ok[0]
+        show_preview_dialog(self, self._app_icon, c, ci, t, self.items)
 
-    def _build_items_for_pdf(self) -> list[dict]:
-        cloned = deepcopy(self.items)
-        for it in cloned:
+    def _build_pdf_payload(self) -> tuple[list[dict], float, float, float]:
+        """
+        En una sola pasada: ítems con montos en la moneda mostrada y totales BASE
+        (subtotal bruto, descuento total, total neto).
+        """
+        # Copia superficial: solo se reemplazan montos; pdfgen/ticketgen/histórico
+        # leen los ítems sin modificar sus dicts anidados (_prod).
+        # convert_from_base es monto * tasa: la tasa se lee una vez (1.0 en moneda base).
+        try:
+            rate = float(get_currency_context()[2])
+        except Exception:
+            rate = 1.0
+        cloned = []
+        subtotal_bruto_base = 0.0
+        descuento_total_base = 0.0
+        total_neto_base = 0.0
+        for src in self.items:
+            it = dict(src)
             price_base = float(nz(it.get("precio"), 0.0))
-            total_base = float(nz(it.get("total"), 0.0))
             subtotal_base = float(nz(it.get("subtotal_base"), price_base * nz(it.get("cantidad"), 0.0)))
             d_monto_base = float(nz(it.get("descuento_monto"), 0.0))
+            total_raw = it.get("total")
 
-            it["precio"] = convert_from_base(price_base)
-            it["total"] = convert_from_base(total_base)
-            it["subtotal"] = convert_from_base(subtotal_base)
-            it["descuento"] = convert_from_base(d_monto_base)
-        return cloned
+            subtotal_bruto_base += subtotal_base
+            descuento_total_base += d_monto_base
+            total_neto_base += float(nz(total_raw, subtotal_base - d_monto_base))
+
+            it["precio"] = price_base * rate
+            it["total"] = float(nz(total_raw, 0.0)) * rate
+            it["subtotal"] = subtotal_base * rate
+            it["descuento"] = d_monto_base * rate
+            cloned.append(it)
+        return cloned, subtotal_bruto_base, descuento_total_base, total_neto_base
 
     def _get_metodo_pago_actual(self) -> str:
         """
@@ -142,40 +215,15 @@ class PdfActionsMixin:
         QTimer.singleShot(200, _bring_front)
 
     def generar_cotizacion(self):
-        c = self.entry_cliente.text()
-        ci = self.entry_cedula.text()
-        t = self.entry_telefono.text()
-        d = self.entry_direccion.text()
-        e = self.entry_email.text()
-        if not all([c, ci, t, d, e]):
-            QMessageBox.warning(self, "Advertencia", "❌ Faltan datos del cliente")
+        if getattr(self, "_pdf_job", None) is not None:
             return
-        ok_doc, msg_doc, tipo_doc = self._validate_doc_phone_values(ci, t, direccion=d, email=e)
-        if not ok_doc:
-            QMessageBox.warning(self, "Advertencia", msg_doc)
-            return
-
-        total_items = sum(nz(i.get("total")) for i in self.items) if self.items else 0.0
-        if not self.items or total_items <= 0:
-            QMessageBox.warning(self, "Advertencia", "❌ Agrega al menos un producto a la cotización")
+        ok = self._validate_for_output("❌ Agrega al menos un producto a la cotización")
+        if ok is None:
             return
+        (c, ci, t, d, e), tipo_doc = ok
 
-        # ===== Totales BASE =====
-        subtotal_bruto_base = 0.0
-        descuento_total_base = 0.0
-        total_neto_base = 0.0
-
-        for it in self.items:
-            precio_base = float(nz(it.get("precio"), 0.0))
-            subtotal_line_base = float(nz(it.get("subtotal_base"), precio_base * nz(it.get("cantidad"), 0.0)))
-            d_monto_base = float(nz(it.get("descuento_monto"), 0.0))
-            total_line_base = float(nz(it.get("total"), subtotal_line_base - d_monto_base))
-
-            subtotal_bruto_base += subtotal_line_base
-            descuento_total_base += d_monto_base
-            total_neto_base += total_line_base
-
-        items_pdf = self._build_items_for_pdf()
+        # ===== Ítems del PDF + totales BASE (una sola pasada) =====
+        items_pdf, subtotal_bruto_base, descuento_total_base, total_neto_base = self._build_pdf_payload()
 
         subtotal_bruto_shown = convert_from_base(subtotal_bruto_base)
         descuento_total_shown = convert_from_base(descuento_total_base)
@@ -187,6 +235,9 @@ class PdfActionsMixin:
         metodo_pago_db = metodo_pago_pdf if APP_COUNTRY in ("PARAGUAY", "PERU") else ""
 
         emission_dt = datetime.datetime.now()
+        # Moneda fijada al armar el payload: el render corre en otro hilo y el
+        # contexto global de moneda puede cambiar mientras tanto.
+        curr, _sec, rate = get_currency_context()
 
         datos = {
             "fecha": emission_dt,
@@ -200,27 +251,26 @@ class PdfActionsMixin:
             "subtotal_bruto": subtotal_bruto_shown,
             "descuento_total": descuento_total_shown,
             "total_general": total_neto_shown,
+            "currency": str(curr or ""),
+            "tasa": float(rate) if rate is not None else None,
         }
 
-        db_warn = ""
-        saved_ok = False
-
+        # Correlativo (API + SQLite) en el hilo de la UI; el render del PDF va al pool.
         try:
-            db_path = resolve_db_path()
-            con = connect(db_path)
-            ensure_schema(con)
-
-            created_at = emission_dt.isoformat(timespec="seconds")
-            curr, _sec, rate = get_currency_context()
-            local_last_value = get_quote_no_value(con, COUNTRY_CODE)
-            reserved_quote = reserve_next_quote_code(local_last_value=local_last_value)
-            reserved_quote_no = str(reserved_quote.get("quote_no") or "").strip()
-            if not reserved_quote_no:
-                raise RuntimeError("El API no devolvio un correlativo valido.")
+            con = connect(resolve_db_path())
+            try:
+                ensure_schema(con)
+                local_last_value = get_quote_no_value(con, COUNTRY_CODE)
+                reserved_quote = reserve_next_quote_code(local_last_value=local_last_value)
+                reserved_quote_no = str(reserved_quote.get("quote_no") or "").strip()
+                if not reserved_quote_no:
+                    raise RuntimeError("El API no devolvio un correlativo valido.")
 
-            with tx(con):
-                ensure_quote_no_at_least(con, COUNTRY_CODE, max(0, int(reserved_quote_no) - 1))
-                quote_no = next_quote_no(con, COUNTRY_CODE, width=7)
+                with tx(con):
+                    ensure_quote_no_at_least(con, COUNTRY_CODE, max(0, int(reserved_quote_no) - 1))
+                    quote_no = next_quote_no(con, COUNTRY_CODE, width=7)
+            finally:
+                con.close()
 
             quote_code = format_quote_code(
                 country_code=COUNTRY_CODE,
@@ -228,94 +278,157 @@ class PdfActionsMixin:
                 quote_no=quote_no,
                 width=7,
             )
+        except Exception as e:
+            log.exception("Error al generar PDF")
+            self._show_generar_pdf_error(e)
+            return
+
+        self._pdf_job_ctx = {
+            "datos": datos,
+            "quote_code": quote_code,
+            "created_at": emission_dt.isoformat(timespec="seconds"),
+            "tipo_doc": tipo_doc,
+            "metodo_pago_db": metodo_pago_db,
+            "currency_shown": str(curr or ""),
+            "tasa_shown": float(rate) if rate is not None else None,
+            "subtotal_bruto_base": float(subtotal_bruto_base),
+            "descuento_total_base": float(descuento_total_base),
+            "total_neto_base": float(total_neto_base),
+            "subtotal_bruto_shown": float(subtotal_bruto_shown),
+            "descuento_total_shown": float(descuento_total_shown),
+            "total_neto_shown": float(total_neto_shown),
+            # Copia: la tabla sigue editable mientras se genera el PDF.
+            "items_base": [dict(it) for it in self.items],
+        }
+        task = PdfJob(datos, quote_code)
+        task.signals.finished.connect(self._on_pdf_job_finished)
+        self._pdf_job = task
+        self._set_pdf_job_controls_enabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    def _set_pdf_job_controls_enabled(self, enabled: bool) -> None:
+        """Generar y cambio de moneda quedan bloqueados mientras se renderiza el PDF."""
+        for name in ("_btn_generar", "btn_moneda"):
+            btn = getattr(self, name, None)
+            if btn is not None:
+                try:
+                    btn.setEnabled(enabled)
+                except Exception:
+                    pass
+
+    def _show_generar_pdf_error(self, e) -> None:
+        QMessageBox.critical(
+            self,
+            "Error al generar PDF",
+            (
+                "❌ No se pudo generar la cotización.\n\n"
+                "La app sincroniza el correlativo local consultando el servidor antes de guardar.\n\n"
+                f"Detalle:\n{e}"
+            ),
+        )
 
-            ruta = generar_pdf(datos, fixed_quote_no=quote_code)
-            log.info("PDF generado en %s", ruta)
-            pdf_store = os.path.basename(ruta)
+    def _on_pdf_job_finished(self, ruta, err: str):
+        ctx = getattr(self, "_pdf_job_ctx", None) or {}
+        self._pdf_job = None
+        self._pdf_job_ctx = None
+        self._set_pdf_job_controls_enabled(True)
+        close_pending = bool(getattr(self, "_close_after_pdf_job", False))
+        self._close_after_pdf_job = False
+        if not ruta:
+            self._show_generar_pdf_error(err)
+        else:
             try:
-                with tx(con):
-                    insert_quote(
-                        con,
-                        country_code=COUNTRY_CODE,
-                        quote_no=quote_code,
-                        created_at=created_at,
-                        cliente=c,
-                        cedula=ci,
-                        telefono=t,
-                        direccion=d,
-                        email=e,
-                        tipo_documento=tipo_doc,
-                        metodo_pago=metodo_pago_db,
-                        currency_shown=str(curr or ""),
-                        tasa_shown=float(rate) if rate is not None else None,
-                        subtotal_bruto_base=float(subtotal_bruto_base),
-                        descuento_total_base=float(descuento_total_base),
-                        total_neto_base=float(total_neto_base),
-                        subtotal_bruto_shown=float(subtotal_bruto_shown),
-                        descuento_total_shown=float(descuento_total_shown),
-                        total_neto_shown=float(total_neto_shown),
-                        pdf_path=pdf_store,
-                        items_base=self.items,
-                        items_shown=items_pdf,
-                    )
-                saved_ok = True
+                # Cierra la ventana al terminar.
+                self._finish_cotizacion(ruta, ctx)
+                return
             except Exception as e:
-                log.exception("No se pudo guardar la cotización en SQLite")
-                db_warn = f"\n\n⚠️ No se pudo guardar en histórico:\n{e}"
-                saved_ok = False
-
-            if saved_ok:
-                qe = getattr(self, "_quote_events", None)
-                if qe is not None:
-                    try:
-                        qe.quote_saved.emit()
-                    except Exception:
-                        pass
-
-            con.close()
-
-            ticket_paths = generar_ticket_para_cotizacion(
-                pdf_path=ruta,
-                items_pdf=datos["items"],
-                quote_code=quote_code,
-                country=APP_COUNTRY,
-                cliente_nombre=c,
-                printer_name="TICKERA",
-                width=48,
-                top_mm=0.0,
-                bottom_mm=10.0,
-                cut_mode="full_feed",
-            )
+                log.exception("Error al generar PDF")
+                self._show_generar_pdf_error(e)
+        if close_pending:
+            self.close()
 
-            msg = f"📄 Cotización generada:\n{ruta}{db_warn}"
+    def _finish_cotizacion(self, ruta: str, ctx: dict) -> None:
+        """Guarda en histórico, arma el ticket y avisa (hilo de la UI, PDF ya escrito)."""
+        log.info("PDF generado en %s", ruta)
+        datos = ctx["datos"]
+        quote_code = ctx["quote_code"]
+        db_warn = ""
+        saved_ok = False
 
-            if ticket_paths.get("ticket_cmd"):
-                msg += (
-                    "\n\n🧾 Ticket listo."
-                    "\nSe creó un archivo para imprimir (doble click) en:"
-                    f"\n{ticket_paths['ticket_cmd']}"
-                    "\n\n(Se guarda en: cotizaciones/tickets/)"
+        con = connect(resolve_db_path())
+        try:
+            with tx(con):
+                insert_quote(
+                    con,
+                    country_code=COUNTRY_CODE,
+                    quote_no=quote_code,
+                    created_at=ctx["created_at"],
+                    cliente=datos["cliente"],
+                    cedula=datos["cedula"],
+                    telefono=datos["telefono"],
+                    direccion=datos["direccion"],
+                    email=datos["email"],
+                    tipo_documento=ctx["tipo_doc"],
+                    metodo_pago=ctx["metodo_pago_db"],
+                    currency_shown=ctx["currency_shown"],
+                    tasa_shown=ctx["tasa_shown"],
+                    subtotal_bruto_base=ctx["subtotal_bruto_base"],
+                    descuento_total_base=ctx["descuento_total_base"],
+                    total_neto_base=ctx["total_neto_base"],
+                    subtotal_bruto_shown=ctx["subtotal_bruto_shown"],
+                    descuento_total_shown=ctx["descuento_total_shown"],
+                    total_neto_shown=ctx["total_neto_shown"],
+                    pdf_path=os.path.basename(ruta),
+                    items_base=ctx["items_base"],
+                    items_shown=datos["items"],
                 )
+            saved_ok = True
+        except Exception as e:
+            log.exception("No se pudo guardar la cotización en SQLite")
+            db_warn = f"\n\n⚠️ No se pudo guardar en histórico:\n{e}"
+            saved_ok = False
+        finally:
+            con.close()
 
-            QMessageBox.information(self, "Cotización Generada", msg)
-            QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(COTIZACIONES_DIR)))
+        if saved_ok:
+            qe = getattr(self, "_quote_events", None)
+            if qe is not None:
+                try:
+                    qe.quote_saved.emit()
+                except Exception:
+                    pass
+
+        ticket_paths = generar_ticket_para_cotizacion(
+            pdf_path=ruta,
+            items_pdf=datos["items"],
+            quote_code=quote_code,
+            country=APP_COUNTRY,
+            cliente_nombre=datos["cliente"],
+            printer_name="TICKERA",
+            width=48,
+            top_mm=0.0,
+            bottom_mm=10.0,
+            cut_mode="full_feed",
+        )
 
-            # ✅ cerrar ventana y devolver foco al histórico
-            self._focus_history_after_close()
-            self.close()
+        msg = f"📄 Cotización generada:\n{ruta}{db_warn}"
 
-        except Exception as e:
-            log.exception("Error al generar PDF")
-            QMessageBox.critical(
-                self,
-                "Error al generar PDF",
-                (
-                    "❌ No se pudo generar la cotización.\n\n"
-                    "La app sincroniza el correlativo local consultando el servidor antes de guardar.\n\n"
-                    f"Detalle:\n{e}"
-                ),
+        if ticket_paths.get("ticket_cmd"):
+            msg += (
+                "\n\n🧾 Ticket listo."
+                "\nSe creó un archivo para imprimir (doble click) en:"
+                f"\n{ticket_paths['ticket_cmd']}"
+                "\n\n(Se guarda en: cotizaciones/tickets/)"
             )
 
+        QMessageBox.information(self, "Cotización Generada", msg)
+        # Abrir la carpeta en la siguiente vuelta del event loop, ya cerrada la ventana.
+        QTimer.singleShot(0, lambda: QDesktopServices.openUrl(_COT_DIR_URL))
+
+        # ✅ cerrar ventana y devolver foco al histórico
+        self._focus_history_after_close()
+        self.close()
+
     def limpiar_formulario(self):
         self.entry_cliente.clear()
         self.entry_cedula.clear()
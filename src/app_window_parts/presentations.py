@@ -8,11 +8,28 @@ from sqlModels.db import connect
 from ..config import ALLOW_NO_STOCK, CATS
 from ..pricing import price_for_price_id, default_price_id_for_product
 from ..utils import nz
+from ..catalog_manager import product_stock
 from ..presentations import map_pc_to_bottle_code, extract_ml_from_text, ml_from_pres_code_norm
 from ..widgets import SelectorTablaSimple
 
 
+def _cap_stock_by_bottle(stock: float, bottle_stock: float) -> float:
+    """Stock de la presentación limitado por el de su botella; una botella sin stock no cuenta."""
+    if bottle_stock > 0:
+        return min(stock, bottle_stock) if stock > 0 else bottle_stock
+    return stock
+
+
 class PresentationsMixin:
+    def _bottle_for_pc(self, pc: dict) -> dict | None:
+        # Las PCs del catálogo ya vienen resueltas en _pc_to_bottle (ver _index_catalog).
+        key = pc.get("_id_u")
+        pc_to_bottle = getattr(self, "_pc_to_bottle", {})
+        if key in pc_to_bottle:
+            return pc_to_bottle[key]
+        bot_code = map_pc_to_bottle_code(str(pc.get("id", "")))
+        return self._idx_bottles.get(bot_code or "")
+
     def _presentation_relation_parts(self, pres: dict) -> tuple[set[str], set[str]]:
         raw = str(
             pres.get("CODIGOS_PRODUCTO")
@@ -74,10 +91,29 @@ class PresentationsMixin:
         return False
 
     def _product_department(self, prod: dict) -> str:
-        return str(prod.get("departamento", "") or prod.get("categoria", "")).strip().upper()
+        # Los productos del catálogo ya la traen normalizada (ver _index_catalog).
+        dep = prod.get("_dep_u")
+        if dep is None:
+            dep = str(prod.get("departamento", "") or prod.get("categoria", "")).strip().upper()
+        return dep
 
     def _product_gender(self, prod: dict) -> str:
-        return str(prod.get("genero", "")).strip().lower()
+        gen = prod.get("_gen_l")
+        if gen is None:
+            gen = str(prod.get("genero", "")).strip().lower()
+        return gen
+
+    def _presentation_department(self, pres: dict) -> str:
+        dep = pres.get("_dep_u")
+        if dep is None:
+            dep = str(pres.get("DEPARTAMENTO") or pres.get("departamento") or "").strip().upper()
+        return dep
+
+    def _presentation_gender(self, pres: dict) -> str:
+        gen = pres.get("_gen_l")
+        if gen is None:
+            gen = str(pres.get("GENERO") or pres.get("genero") or "").strip().lower()
+        return gen
 
     def _generic_category_markers(self) -> set[str]:
         cache = getattr(self, "_presentation_generic_categories_cache", None)
@@ -107,6 +143,92 @@ class PresentationsMixin:
         self._presentation_product_map_cache = cache
         return cache
 
+    def _base_products_by_department(self) -> dict[str, list[int]]:
+        """Posiciones en self.productos de los productos base (no genéricos), por departamento."""
+        cache = getattr(self, "_presentation_base_dept_cache", None)
+        if cache is not None:
+            return cache
+
+        cache = {}
+        for i, p in enumerate(self.productos or []):
+            if not self._is_generic_category_row(p):
+                cache.setdefault(self._product_department(p), []).append(i)
+        self._presentation_base_dept_cache = cache
+        return cache
+
+    def _base_products_by_department_gender(self) -> dict[tuple[str, str], list[int]]:
+        """Igual que _base_products_by_department, separado además por género."""
+        cache = getattr(self, "_presentation_base_dept_gen_cache", None)
+        if cache is not None:
+            return cache
+
+        cache = {}
+        prods = self.productos
+        for dep, positions in self._base_products_by_department().items():
+            for i in positions:
+                cache.setdefault((dep, self._product_gender(prods[i])), []).append(i)
+        self._presentation_base_dept_gen_cache = cache
+        return cache
+
+    def _base_products_in(self, departments, gen: str = "") -> list[dict]:
+        # Mismo orden de catálogo que recorrer self.productos completo.
+        if gen:
+            by_dept_gen = self._base_products_by_department_gender()
+            positions = [i for d in departments for i in by_dept_gen.get((d, gen), ())]
+        else:
+            by_dept = self._base_products_by_department()
+            positions = [i for d in departments for i in by_dept.get(d, ())]
+        if len(departments) > 1:
+            positions.sort()
+        prods = self.productos
+        return [prods[i] for i in positions]
+
+    def _presentations_by_ml(self) -> dict[int, list[dict]]:
+        """Presentaciones agrupadas por ml (según su código), en orden de catálogo."""
+        cache = getattr(self, "_presentation_ml_index_cache", None)
+        if cache is not None:
+            return cache
+
+        cache = {}
+        for pr in (self.presentaciones or []):
+            ml = ml_from_pres_code_norm(pr.get("CODIGO_NORM") or pr.get("CODIGO"))
+            cache.setdefault(ml, []).append(pr)
+        self._presentation_ml_index_cache = cache
+        return cache
+
+    def _presentation_ml_groups(self, ml: int):
+        """
+        Presentaciones de `ml` agrupadas por departamento, como (presentación, género)
+        en orden de catálogo, más los sets de departamento / (departamento, género)
+        con coincidencia. Se arma una vez por ml y catálogo.
+        """
+        cache = getattr(self, "_presentation_ml_groups_cache", None)
+        if cache is None:
+            cache = {}
+            self._presentation_ml_groups_cache = cache
+        hit = cache.get(ml)
+        if hit is not None:
+            return hit
+
+        by_dep: dict[str, list[tuple[dict, str]]] = {}
+        deps_with_match: set[str] = set()
+        deps_with_wildcard: set[str] = set()
+        deps_with_exact_gender: set[tuple[str, str]] = set()
+        for pr in self._presentations_by_ml().get(ml, ()):
+            dep = self._presentation_department(pr)
+            gen = self._presentation_gender(pr)
+            by_dep.setdefault(dep, []).append((pr, gen))
+            if not dep:
+                continue
+            deps_with_match.add(dep)
+            if gen:
+                deps_with_exact_gender.add((dep, gen))
+            else:
+                deps_with_wildcard.add(dep)
+        hit = (by_dep, deps_with_match, deps_with_wildcard, deps_with_exact_gender)
+        cache[ml] = hit
+        return hit
+
     def _service_department_markers(self) -> set[str]:
         return self._generic_category_markers()
 
@@ -121,8 +243,8 @@ class PresentationsMixin:
             v = str(pres.get(k) or "").strip().upper()
             if v and v not in codes:
                 codes.append(v)
-        dep = str(pres.get("DEPARTAMENTO") or pres.get("departamento") or "").strip().upper()
-        gen = str(pres.get("GENERO") or pres.get("genero") or "").strip().lower()
+        dep = self._presentation_department(pres)
+        gen = self._presentation_gender(pres)
         key = (tuple(codes), dep, gen)
         if key in cache:
             return [dict(r) for r in cache[key]]
@@ -188,7 +310,7 @@ class PresentationsMixin:
         prod_map = self._product_lookup()
         base_dep = self._product_department(base)
         base_gen = self._product_gender(base)
-        base_stock = float(nz(base.get("cantidad_disponible"), 0.0))
+        base_stock = product_stock(base)
         service_markers = self._service_department_markers()
 
         ratios: list[float] = []
@@ -212,49 +334,29 @@ class PresentationsMixin:
             comp = prod_map.get(rel_code)
             if not comp:
                 return 0.0
-            ratios.append(float(nz(comp.get("cantidad_disponible"), 0.0)) / need_qty)
+            ratios.append(product_stock(comp) / need_qty)
 
         if not ratios:
             return 0.0
         return round(max(0.0, min(ratios)), 6)
 
-    def _select_default_bottle_for_presentacion(self, pres: dict):
+    def _select_default_bottle_for_presentacion(self, pres: dict) -> tuple[dict | None, dict | None]:
+        """(PC, producto botella) por defecto para la presentación, o (None, None)."""
         if not bool(pres.get("REQUIERE_BOTELLA", False)):
-            return None
+            return None, None
 
         ml_pres = ml_from_pres_code_norm(
             pres.get("CODIGO_NORM") or pres.get("CODIGO") or ""
         )
-        bot_opts = []
-        for b in self._botellas_pc:
-            bot_code = map_pc_to_bottle_code(str(b.get("id", "")))
-            bot = next(
-                (
-                    bb
-                    for bb in self.productos
-                    if str(bb.get("id", "")).upper() == (bot_code or "").upper()
-                    and (bb.get("categoria", "").upper() == "BOTELLAS")
-                ),
-                None,
-            )
-            if not bot:
-                continue
-            if (
-                float(nz(bot.get("cantidad_disponible"), 0.0)) <= 0
-                and not ALLOW_NO_STOCK
-            ):
-                continue
-            ml_b = extract_ml_from_text(bot.get("nombre", "")) or extract_ml_from_text(
-                b.get("nombre", "")
-            )
-            if ml_b != ml_pres:
+        for b, bot in self._pc_bottles_by_ml.get(ml_pres, ()):
+            if bot["_stock"] <= 0 and not ALLOW_NO_STOCK:
                 continue
-            bot_opts.append(b)
-        return bot_opts[0] if bot_opts else None
+            return b, bot
+        return None, None
 
     def _agregar_presentacion_con_base(self, pres: dict, base: dict, *, silent: bool = False) -> bool:
-        dep = (pres.get("DEPARTAMENTO") or pres.get("departamento") or "").strip().upper()
-        gen = (pres.get("GENERO") or pres.get("genero") or "").strip().lower()
+        dep = self._presentation_department(pres)
+        gen = self._presentation_gender(pres)
         base_dep = self._product_department(base)
         base_gen = self._product_gender(base)
         base_id = str(base.get("id", "")).strip().upper()
@@ -313,7 +415,7 @@ class PresentationsMixin:
                 QMessageBox.warning(self, "Sin stock", "❌ No hay stock suficiente para esta presentación.")
             return False
 
-        botella = self._select_default_bottle_for_presentacion(pres)
+        botella, botella_prod = self._select_default_bottle_for_presentacion(pres)
         if bool(pres.get("REQUIERE_BOTELLA", False)) and botella is None:
             if not silent:
                 QMessageBox.warning(
@@ -353,43 +455,20 @@ class PresentationsMixin:
             else (precio_oferta if precio_oferta > 0 else precio_pres)
         ) + precio_bot
 
-        nombre_pres = (
-            pres.get("NOMBRE") or pres.get("CODIGO_NORM") or pres.get("CODIGO")
-        )
+        pres_code = pres.get("CODIGO_NORM") or pres.get("CODIGO")
+        nombre_pres = pres.get("NOMBRE") or pres_code
         nombre_final = f"A LA MODE {base.get('nombre', '')} {nombre_pres}".strip()
 
         if botella:
             codigo_final = f"{botella.get('id', '')}{base.get('id', '')}"
             ml = extract_ml_from_text(botella.get("nombre", ""))
         else:
-            codigo_final = (
-                f"{base.get('id', '')}{pres.get('CODIGO_NORM') or pres.get('CODIGO')}"
-            )
-            ml = ml_from_pres_code_norm(
-                pres.get("CODIGO_NORM") or pres.get("CODIGO") or ""
-            )
+            codigo_final = f"{base.get('id', '')}{pres_code}"
+            ml = ml_from_pres_code_norm(pres_code or "")
 
         stock_ref = float(combo_stock)
-
         if botella:
-            stock_bot = float(
-                nz(
-                    next(
-                        (
-                            bb
-                            for bb in self.productos
-                            if str(bb.get("id", "")).upper()
-                            == map_pc_to_bottle_code(str(botella.get("id", "")))
-                            and (bb.get("categoria", "").upper() == "BOTELLAS")
-                        ),
-                        {},
-                    ).get("cantidad_disponible", 0.0)
-                )
-            )
-            if stock_ref > 0 and stock_bot > 0:
-                stock_ref = min(stock_ref, stock_bot)
-            elif stock_bot > 0:
-                stock_ref = stock_bot
+            stock_ref = _cap_stock_by_bottle(stock_ref, botella_prod["_stock"])
 
         item = {
             "_prod": {
@@ -419,16 +498,7 @@ class PresentationsMixin:
         return True
 
     def _selector_pc(self, pc: dict):
-        mapped_code = map_pc_to_bottle_code(str(pc.get("id", "")))
-        botella_ref = next(
-            (
-                b
-                for b in self.productos
-                if str(b.get("id", "")).upper() == (mapped_code or "")
-                and b.get("categoria", "").upper() == "BOTELLAS"
-            ),
-            None,
-        )
+        botella_ref = self._bottle_for_pc(pc)
         ml_botella = (
             extract_ml_from_text(botella_ref.get("nombre", "")) if botella_ref else 0
         )
@@ -442,25 +512,10 @@ class PresentationsMixin:
             )
             return
 
-        pres_ml_matches = [
-            pr
-            for pr in self.presentaciones
-            if ml_from_pres_code_norm(pr.get("CODIGO_NORM") or pr.get("CODIGO"))
-            == ml_botella
-        ]
-        deps_with_match: set[str] = set()
-        deps_with_wildcard: set[str] = set()
-        deps_with_exact_gender: set[tuple[str, str]] = set()
-        for pr in pres_ml_matches:
-            dep_match = (pr.get("DEPARTAMENTO", "") or "").upper()
-            if not dep_match:
-                continue
-            deps_with_match.add(dep_match)
-            pr_gen = (pr.get("GENERO", "") or "").strip().lower()
-            if pr_gen:
-                deps_with_exact_gender.add((dep_match, pr_gen))
-            else:
-                deps_with_wildcard.add(dep_match)
+        # (presentación, género) de este ml por departamento, ya agrupadas por catálogo.
+        ml_pres_by_dep, deps_with_match, deps_with_wildcard, deps_with_exact_gender = (
+            self._presentation_ml_groups(ml_botella)
+        )
 
         def base_has_match(p):
             dep_base = self._product_department(p)
@@ -469,12 +524,13 @@ class PresentationsMixin:
             gen_base = self._product_gender(p)
             if dep_base not in deps_with_wildcard and (dep_base, gen_base) not in deps_with_exact_gender:
                 return False
-            for pr in pres_ml_matches:
-                if (pr.get("DEPARTAMENTO", "") or "").upper() == dep_base:
-                    pr_gen = (pr.get("GENERO", "") or "").strip().lower()
-                    if not pr_gen or pr_gen == gen_base:
-                        if ALLOW_NO_STOCK or self._presentation_available_stock_for_base(pr, p) >= 1.0:
-                            return True
+            # Pasó los sets: existe una presentación compatible; solo falta el stock.
+            if ALLOW_NO_STOCK:
+                return True
+            for pr, pr_gen in ml_pres_by_dep.get(dep_base, ()):
+                if not pr_gen or pr_gen == gen_base:
+                    if self._presentation_available_stock_for_base(pr, p) >= 1.0:
+                        return True
             return False
 
         filas_base = [
@@ -484,9 +540,8 @@ class PresentationsMixin:
                 "categoria": p.get("categoria", ""),
                 "genero": p.get("genero", ""),
             }
-            for p in self.productos
+            for p in self._base_products_in(deps_with_match)
             if base_has_match(p)
-            and (not self._is_generic_category_row(p))
         ]
         if not filas_base:
             QMessageBox.warning(self, "Sin bases", "No hay productos base compatibles para este PC.")
@@ -505,11 +560,9 @@ class PresentationsMixin:
         dep_base = self._product_department(base)
         gen_base = self._product_gender(base)
         pres_candidates = []
-        for pr in pres_ml_matches:
-            if (pr.get("DEPARTAMENTO", "") or "").upper() == dep_base:
-                pr_gen = (pr.get("GENERO", "") or "").strip().lower()
-                if not pr_gen or pr_gen == gen_base:
-                    pres_candidates.append(pr)
+        for pr, pr_gen in ml_pres_by_dep.get(dep_base, ()):
+            if not pr_gen or pr_gen == gen_base:
+                pres_candidates.append(pr)
         if not pres_candidates:
             QMessageBox.warning(
                 self,
@@ -548,15 +601,9 @@ class PresentationsMixin:
             QMessageBox.warning(self, "Sin stock", "❌ No hay stock suficiente para esta presentación.")
             return
 
-        stock_bot = (
-            float(nz(botella_ref.get("cantidad_disponible"), 0.0)) if botella_ref else None
-        )
         stock_ref = float(combo_stock)
-        if stock_bot is not None:
-            if stock_bot > 0 and stock_ref > 0:
-                stock_ref = min(stock_bot, stock_ref)
-            elif stock_bot > 0:
-                stock_ref = stock_bot
+        if botella_ref:
+            stock_ref = _cap_stock_by_bottle(stock_ref, botella_ref["_stock"])
 
         item = {
             "_prod": {
@@ -585,27 +632,17 @@ class PresentationsMixin:
         self.model.add_item(item)
 
     def _selector_presentacion(self, pres: dict):
-        dep = (pres.get("DEPARTAMENTO") or pres.get("departamento") or "").strip().upper()
-        gen = (pres.get("GENERO") or pres.get("genero") or "").strip().lower()
+        dep = self._presentation_department(pres)
+        gen = self._presentation_gender(pres)
         essence_cats = {c.upper() for c in CATS}
         dep_is_presentation = dep in {"", "PRESENTACION", "PRESENTACIONES"}
         rel_codes = self._presentation_base_codes(pres)
         wildcard_cats = self._presentation_wildcard_categories(pres)
         fixed_component_codes = self._presentation_global_fixed_component_codes()
-        base_pool = [
-            p
-            for p in self.productos
-            if not self._is_generic_category_row(p)
-        ]
-
-        def _matches_dep_and_gen(p: dict) -> bool:
-            p_dep = self._product_department(p)
-            p_gen = self._product_gender(p)
-            dep_ok = (p_dep in essence_cats) if dep_is_presentation else (p_dep == dep)
-            gen_ok = (not gen) or (p_gen == gen)
-            return dep_ok and gen_ok
-
-        base_candidates = [p for p in base_pool if _matches_dep_and_gen(p)]
+        # El índice ya agrupa por departamento (y género si la presentación lo fija).
+        base_candidates = self._base_products_in(
+            essence_cats if dep_is_presentation else (dep,), gen
+        )
 
         if wildcard_cats:
             wild_filtered = [
@@ -618,12 +655,11 @@ class PresentationsMixin:
             if wild_filtered:
                 base_candidates = wild_filtered
         elif rel_codes:
-            rel_candidates = [
+            rel_filtered = [
                 p
-                for p in base_pool
+                for p in base_candidates
                 if str(p.get("id", "")).strip().upper() in rel_codes
             ]
-            rel_filtered = [p for p in rel_candidates if _matches_dep_and_gen(p)]
             if rel_filtered:
                 base_candidates = rel_filtered
 
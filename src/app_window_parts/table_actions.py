@@ -11,7 +11,7 @@ from ..widgets import (
     show_discount_dialog_for_item,
     show_observation_dialog,
 )
-from .models import CAN_EDIT_UNIT_PRICE
+from .models import CAN_EDIT_UNIT_PRICE, _item_cat_u
 
 
 class TableActionsMixin:
@@ -20,13 +20,9 @@ class TableActionsMixin:
         if sm is None:
             return []
 
-        rows = sorted(
-            {
-                int(ix.row())
-                for ix in (sm.selectedIndexes() or [])
-                if 0 <= int(ix.row()) < len(self.items)
-            }
-        )
+        # selectedIndexes trae una entrada por celda: primero filas únicas, luego el rango.
+        n = len(self.items)
+        rows = sorted(r for r in {int(ix.row()) for ix in (sm.selectedIndexes() or [])} if 0 <= r < n)
         if rows:
             return rows
 
@@ -34,7 +30,7 @@ class TableActionsMixin:
             cur = sm.currentIndex()
         except Exception:
             cur = QModelIndex()
-        if cur.isValid() and 0 <= int(cur.row()) < len(self.items):
+        if cur.isValid() and 0 <= int(cur.row()) < n:
             return [int(cur.row())]
         return []
 
@@ -94,7 +90,7 @@ class TableActionsMixin:
         item = self.items[row]
 
         menu = QMenu(self)
-        cat = (item.get("categoria") or "").upper()
+        cat = _item_cat_u(item)
 
         menu.addAction(self.act_edit_discount)
 
@@ -122,7 +118,7 @@ class TableActionsMixin:
         if row < 0 or row >= len(self.items):
             return
         item = self.items[row]
-        cat = (item.get("categoria") or "").upper()
+        cat = _item_cat_u(item)
 
         if col == 2:  # Descuento
             self._abrir_dialogo_descuento(row)
@@ -172,11 +168,7 @@ class TableActionsMixin:
         if new_obs is None:
             return
         item["observacion"] = new_obs
-        self.model.dataChanged.emit(
-            self.model.index(row, 0),
-            self.model.index(row, self.model.columnCount() - 1),
-            [Qt.DisplayRole],
-        )
+        self.model.refresh_observation(row)
 
     def editar_observacion(self):
         row = self._single_item_action_row()
@@ -204,24 +196,25 @@ class TableActionsMixin:
             factor_total_por_categoria,
         )
 
-        cat = (item.get("categoria") or "").upper()
+        cat = _item_cat_u(item)
         qty = float(nz(item.get("cantidad"), 0.0))
         base_prod = item.get("_prod") or {}
 
         override = item.get("precio_override", None)
+        tier = item.get("precio_tier")
         if cat != "SERVICIO":
             override = None
             item["precio_override"] = None
         if override is not None:
             unit_price = float(override)
             item["id_precioventa"] = 4
-        elif item.get("precio_tier"):
-            unit_price = float(_price_from_tier(base_prod, item["precio_tier"]) or 0.0)
+        elif tier:
+            unit_price = float(_price_from_tier(base_prod, tier) or 0.0)
             if unit_price <= 0:
                 unit_price = float(
                     precio_unitario_por_categoria(cat, base_prod, qty) or 0.0
                 )
-            tier_l = str(item.get("precio_tier") or "").strip().lower()
+            tier_l = str(tier).strip().lower()
             if "min" in tier_l:
                 item["id_precioventa"] = 2
             elif "oferta" in tier_l or "promo" in tier_l:
@@ -268,10 +261,11 @@ class TableActionsMixin:
         if not rows:
             return
 
+        # Todas las filas en un solo set_prices: un único dataChanged para la selección.
+        changes = {}
         for r in rows:
-            idx = self.model.index(r, 4)
             item = self.items[r]
-            cat = (item.get("categoria") or "").upper()
+            cat = _item_cat_u(item)
             if cat == "SERVICIO":
                 continue
             pid = int(default_price_id_for_product(item.get("_prod") or {}))
@@ -280,7 +274,9 @@ class TableActionsMixin:
                 tier = "minimo"
             elif pid == 3:
                 tier = "oferta"
-            self.model.setData(idx, {"mode": "tier", "tier": tier}, Qt.EditRole)
+            changes[r] = {"mode": "tier", "tier": tier}
+        if changes:
+            self.model.set_prices(changes)
 
     def eliminar_producto(self):
         rows = self._selected_item_rows()
@@ -216,8 +216,20 @@ class UiMixin:
         return True, "", str(doc_type or "").strip().upper()
 
     def _update_title_with_client(self, text: str):
-        name = (text or "").strip()
-        self.setWindowTitle(f"{name} - {BASE_APP_TITLE}" if name else BASE_APP_TITLE)
+        # textChanged llega por tecla: el título se actualiza al pausar la escritura.
+        timer = getattr(self, "_title_timer", None)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(self._apply_client_title)
+            self._title_timer = timer
+        timer.start(200)
+
+    def _apply_client_title(self):
+        name = (self.entry_cliente.text() or "").strip()
+        title = f"{name} - {BASE_APP_TITLE}" if name else BASE_APP_TITLE
+        if self.windowTitle() != title:
+            self.setWindowTitle(title)
 
     def _on_ai_client_picked(self, payload: dict):
         cli = str(payload.get("cliente") or "").strip()
@@ -492,6 +504,35 @@ class UiMixin:
         except Exception:
             pass
 
+    _FIT_TO_CONTENT_COLUMNS = (0, 2, 4, 5)
+
+    def _fit_table_columns(self):
+        # Ajuste completo solo en la primera carga; luego únicamente se ensancha,
+        # así se respetan los anchos del usuario y ningún monto queda cortado.
+        widen_only = self._fit_columns_widen_only
+        self._fit_columns_widen_only = True
+        header = self.table.horizontalHeader()
+        for col in self._FIT_TO_CONTENT_COLUMNS:
+            width = max(self.table.sizeHintForColumn(col), header.sectionSizeHint(col))
+            if widen_only:
+                width = max(width, header.sectionSize(col))
+            if width != header.sectionSize(col):
+                header.resizeSection(col, width)
+
+    def _schedule_fit_table_columns(self, full: bool = False):
+        if full:
+            self._fit_columns_widen_only = False
+        self._fit_columns_timer.start(0)
+
+    def _on_rows_inserted_fit_columns(self, _parent, first: int, last: int):
+        # Tabla vacía hasta ahora: primera carga, ajuste completo.
+        self._schedule_fit_table_columns(full=first == 0 and self.model.rowCount() == last + 1)
+
+    def _on_data_changed_fit_columns(self, top_left, bottom_right, _roles=()):
+        first, last = top_left.column(), bottom_right.column()
+        if any(first <= col <= last for col in self._FIT_TO_CONTENT_COLUMNS):
+            self._schedule_fit_table_columns()
+
     def _focus_last_row(self, row_index: int):
         if bool(getattr(self, "_suppress_focus_last_row", False)):
             return
@@ -626,7 +667,7 @@ class UiMixin:
         if not os.path.isdir(DATA_DIR):
             QMessageBox.warning(self, "Carpeta no encontrada", f"No se encontró la carpeta:\n{DATA_DIR}")
             return
-        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(DATA_DIR)))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(DATA_DIR))
 
     def abrir_carpeta_cotizaciones(self):
         if not os.path.isdir(COTIZACIONES_DIR):
@@ -636,7 +677,7 @@ class UiMixin:
                 f"No se encontró la carpeta:\n{COTIZACIONES_DIR}",
             )
             return
-        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(COTIZACIONES_DIR)))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(COTIZACIONES_DIR))
 
     def _apply_btn_responsive(self, btn: QPushButton, min_w: int = 80, min_h: int = 28):
         sp = QSizePolicy(QSizePolicy.Minimum, QSizePolicy.Fixed)
@@ -1158,6 +1199,27 @@ class UiMixin:
         except Exception:
             return False
 
+    # Columna -> acción de doble clic sobre un ítem real; el resto solo selecciona.
+    _DOUBLE_CLICK_ITEM_ACTIONS = {
+        0: "_dbl_click_edit_cell",  # Código
+        1: "_dbl_click_observacion",  # Producto
+        2: "_dbl_click_descuento",
+        3: "_dbl_click_edit_cell",  # Cantidad
+        4: "_dbl_click_precio",
+    }
+
+    def _dbl_click_edit_cell(self, row: int, col: int):
+        self.table.edit(self.model.index(row, col))
+
+    def _dbl_click_observacion(self, row: int, col: int):
+        self._abrir_dialogo_observacion(row, self.items[row])
+
+    def _dbl_click_descuento(self, row: int, col: int):
+        self._abrir_dialogo_descuento(row)
+
+    def _dbl_click_precio(self, row: int, col: int):
+        self._abrir_selector_precio(row)
+
     def _double_click_tabla(self, idx: QModelIndex):
         try:
             if not idx or not idx.isValid():
@@ -1185,40 +1247,13 @@ class UiMixin:
             except Exception:
                 pass
 
-            if col == 4:
-                try:
-                    self._abrir_selector_precio(row)
-                except Exception:
-                    pass
-                return
-
-            if col == 2:
-                try:
-                    self._abrir_dialogo_descuento(row)
-                except Exception:
-                    pass
-                return
-
-            if col == 0:
-                try:
-                    self.table.edit(model.index(row, col))
-                except Exception:
-                    pass
-                return
-
-            if col == 1:
-                try:
-                    self._abrir_dialogo_observacion(row, self.items[row])
-                except Exception:
-                    pass
-                return
-
-            if col == 3:
-                try:
-                    self.table.edit(model.index(row, col))
-                except Exception:
-                    pass
+            handler = self._DOUBLE_CLICK_ITEM_ACTIONS.get(col)
+            if handler is None:
                 return
+            try:
+                getattr(self, handler)(row, col)
+            except Exception:
+                pass
 
         except Exception:
             pass
@@ -1736,16 +1771,29 @@ class UiMixin:
         self.table.setAlternatingRowColors(True)
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table.verticalHeader().setDefaultSectionSize(34)
 
+        # Sin ResizeToContents: Qt re-mediría todas las filas en cada cambio.
+        # Las columnas se ajustan (con debounce) al cargar y al cambiar montos/filas.
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
         header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.Interactive)
         header.setSectionResizeMode(3, QHeaderView.Interactive)
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(4, QHeaderView.Interactive)
+        header.setSectionResizeMode(5, QHeaderView.Interactive)
         self.table.setColumnWidth(3, 96)
+
+        self._fit_columns_widen_only = False
+        self._fit_columns_timer = QTimer(self)
+        self._fit_columns_timer.setSingleShot(True)
+        self._fit_columns_timer.timeout.connect(self._fit_table_columns)
+        self.model.modelReset.connect(lambda: self._schedule_fit_table_columns())
+        self.model.rowsInserted.connect(self._on_rows_inserted_fit_columns)
+        # refresh_money_columns (cambio de moneda/tasas) y ediciones llegan por dataChanged.
+        self.model.dataChanged.connect(self._on_data_changed_fit_columns)
+        self._fit_table_columns()
 
         self.act_edit = QAction("Editar observación…", self)
         self.act_edit.triggered.connect(self.editar_observacion)
@@ -1793,6 +1841,7 @@ class UiMixin:
         btn_gen.setProperty("variant", "primary")
         self._apply_btn_responsive(btn_gen, 140, 36)
         btn_gen.clicked.connect(self.generar_cotizacion)
+        self._btn_generar = btn_gen
 
         btn_lim = QPushButton("Limpiar")
         btn_lim.setProperty("variant", "danger")
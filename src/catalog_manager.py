@@ -4,6 +4,99 @@ from __future__ import annotations
 import pandas as pd
 from PySide6.QtCore import QObject, Signal
 
+from .utils import nz
+
+
+# Columnas de texto con pocos valores distintos: se comparte un solo str por valor.
+_INTERNED_COLUMNS = frozenset(
+    {"categoria", "departamento", "genero", "ml", "fuente", "DEPARTAMENTO", "GENERO"}
+)
+
+
+def dedupe_values(values: list) -> list:
+    """Reemplaza valores iguales por el mismo objeto (un dict hace de tabla de interning)."""
+    cache: dict = {}
+    setdefault = cache.setdefault
+    return [setdefault(v, v) if isinstance(v, str) else v for v in values]
+
+
+def product_stock(prod: dict) -> float:
+    """Stock disponible de un producto; usa _stock precalculado si el registro lo trae."""
+    stock = prod.get("_stock")
+    if stock is None:
+        stock = float(nz(prod.get("cantidad_disponible"), 0.0))
+    return stock
+
+
+def df_to_records(df: pd.DataFrame | None) -> list[dict]:
+    """
+    Equivale a df.to_dict("records") (escalares nativos de Python), pero arma
+    los dicts columna a columna, bastante más rápido en catálogos grandes.
+    """
+    if df is None or df.empty:
+        return []
+    cols = list(df.columns)
+    columns = []
+    for c in cols:
+        values = df[c].tolist()
+        if c in _INTERNED_COLUMNS:
+            values = dedupe_values(values)
+        columns.append(values)
+    dict_, zip_ = dict, zip
+    return [dict_(zip_(cols, row)) for row in zip_(*columns)]
+
+
+def _upper_column(df: pd.DataFrame, col: str) -> list[str]:
+    """
+    Columna como lista de str en mayúsculas ("" para nulos), en una sola pasada;
+    equivale a fillna("").astype(str).str.upper() sin Series intermedias.
+    """
+    if col not in df.columns:
+        return [""] * len(df)
+    return [
+        v.upper() if isinstance(v, str)
+        else ("" if v is None or v is pd.NA or v != v else str(v).upper())
+        for v in df[col].tolist()
+    ]
+
+
+def product_records(df: pd.DataFrame | None) -> list[dict]:
+    """
+    df_to_records más las claves normalizadas que usan los índices de la ventana
+    (_id_u, _cat_u, _dep_u, _gen_l) y el stock numérico (_stock). Se agregan al
+    convertir: después los registros compartidos ya no se modifican.
+    """
+    records = df_to_records(df)
+    if not records:
+        return records
+    # Departamento/género normalizados se repiten mucho: un mismo objeto str por valor.
+    intern = {}.setdefault
+    ids_u = _upper_column(df, "id")
+    cats_u = dedupe_values(_upper_column(df, "categoria"))
+    for p, id_u, cat_u in zip(records, ids_u, cats_u):
+        p["_id_u"] = id_u
+        p["_cat_u"] = cat_u
+        p["_stock"] = float(nz(p.get("cantidad_disponible"), 0.0))
+        # Mismas claves que PresentationsMixin._product_department / _product_gender.
+        dep_u = str(p.get("departamento", "") or p.get("categoria", "")).strip().upper()
+        gen_l = str(p.get("genero", "")).strip().lower()
+        p["_dep_u"] = intern(dep_u, dep_u)
+        p["_gen_l"] = intern(gen_l, gen_l)
+    return records
+
+
+def presentation_records(df: pd.DataFrame | None) -> list[dict]:
+    """df_to_records más _dep_u/_gen_l normalizados (ver product_records)."""
+    records = df_to_records(df)
+    intern = {}.setdefault
+    for p in records:
+        # Mismas claves que PresentationsMixin._presentation_department / _presentation_gender.
+        dep_u = str(p.get("DEPARTAMENTO") or p.get("departamento") or "").strip().upper()
+        gen_l = str(p.get("GENERO") or p.get("genero") or "").strip().lower()
+        p["_dep_u"] = intern(dep_u, dep_u)
+        p["_gen_l"] = intern(gen_l, gen_l)
+    return records
+
 
 class CatalogManager(QObject):
     """
@@ -18,6 +111,7 @@ class CatalogManager(QObject):
         self._df_presentaciones = df_presentaciones
         self._catalog_health_cache_key: tuple[int, int, int] | None = None
         self._catalog_health_cache_value: tuple[bool, str] = (False, "No hay productos cargados.")
+        self._records_cache: dict[tuple, tuple[pd.DataFrame, list[dict]]] = {}
 
     @property
     def df_productos(self) -> pd.DataFrame:
@@ -31,8 +125,25 @@ class CatalogManager(QObject):
         self._df_productos = df_productos
         self._df_presentaciones = df_presentaciones
         self._catalog_health_cache_key = None
+        self._records_cache = {}
         self.catalog_updated.emit(df_productos, df_presentaciones)
 
+    def records_for(self, df: pd.DataFrame | None, build=df_to_records) -> list[dict]:
+        """
+        Registros de `df` armados con `build` (df_to_records, product_records o
+        presentation_records), convertidos una sola vez por DataFrame y
+        compartidos entre ventanas. Los dicts son de solo lectura.
+        """
+        if df is None:
+            return []
+        key = (id(df), build)
+        hit = self._records_cache.get(key)
+        if hit is not None and hit[0] is df:
+            return hit[1]
+        records = build(df)
+        self._records_cache[key] = (df, records)
+        return records
+
     def _catalog_health_cache_token(self, df: pd.DataFrame) -> tuple[int, int, int]:
         try:
             rows, _cols = tuple(getattr(df, "shape", (0, 0)))
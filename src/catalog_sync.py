@@ -7,13 +7,44 @@ import pandas as pd
 from .logging_setup import get_logger
 from .dataio import _leer_inventario_xlsx
 from .presentations import cargar_presentaciones, cargar_presentaciones_prod
+from .version import __version__
 
 import sqlModels.imports_repo as imports_repo
 import sqlModels.products_repo as products_repo
 import sqlModels.presentations_repo as presentations_repo
+from sqlModels.utils import quick_file_signature
 
 log = get_logger(__name__)
 
+_STARTUP_EXCEL_SIG_KEY = "catalog_startup_excel_sig"
+
+_CATALOG_CACHE_PROD = "productos.pkl"
+_CATALOG_CACHE_PRES = "presentaciones.pkl"
+_CATALOG_CACHE_SIG = "catalog.sig"
+
+
+def _get_meta(con, key: str) -> str | None:
+    r = con.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return str(r["value"]) if r and r["value"] is not None else None
+
+
+def _set_meta(con, key: str, value: str) -> None:
+    con.execute(
+        """
+        INSERT INTO meta(key, value) VALUES(?, ?)
+        ON CONFLICT(key) DO UPDATE SET value=excluded.value
+        """,
+        (str(key), str(value)),
+    )
+
+
+def _startup_excel_signature(paths: tuple[str, ...]) -> str:
+    parts: list[str] = []
+    for path in paths:
+        sig = quick_file_signature(path) if os.path.exists(path) else "-"
+        parts.append(f"{os.path.basename(path)}={sig}")
+    return "|".join(parts)
+
 
 def _find_col_ci(df: pd.DataFrame, *candidates: str) -> str | None:
     low = {str(c).strip().lower(): str(c) for c in list(df.columns)}
@@ -263,6 +294,11 @@ def sync_catalog_from_excel_to_db(con, data_dir: str) -> None:
     inv_lcdp = os.path.join(data_dir, "inventario_lcdp.xlsx")
     inv_ef = os.path.join(data_dir, "inventario_ef.xlsx")
 
+    # Si ningún Excel cambió desde el último sync exitoso, no hay nada que revisar.
+    startup_sig = _startup_excel_signature((inv_lcdp, inv_ef))
+    if _get_meta(con, _STARTUP_EXCEL_SIG_KEY) == startup_sig:
+        return
+
     changed_for_rollup = False
 
     for path in (inv_lcdp, inv_ef):
@@ -307,9 +343,71 @@ def sync_catalog_from_excel_to_db(con, data_dir: str) -> None:
     if changed_for_rollup:
         presentations_repo.rebuild_presentations_rollup(con)
 
+    _set_meta(con, _STARTUP_EXCEL_SIG_KEY, startup_sig)
 
-def load_catalog_from_db(con) -> tuple[pd.DataFrame, pd.DataFrame]:
-    df_prod = products_repo.load_products_current(con)
-    df_pres = presentations_repo.load_presentations_current(con)
+
+def load_catalog_from_db(con, cursor=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Carga productos y presentaciones vigentes.
+    Si se pasa `cursor`, ambas lecturas lo reutilizan.
+    """
+    df_prod = products_repo.load_products_current(con, cursor=cursor)
+    df_pres = presentations_repo.load_presentations_current(con, cursor=cursor)
     df_pres = _normalize_presentations_df_for_app(df_pres)
     return df_prod, df_pres
+
+
+def _catalog_cache_signature(con) -> str:
+    # Toda escritura a *_current pasa por imports_repo.create_import. El cache vive
+    # en DATA_DIR y no junto a la BD: la firma incluye qué BD es (ruta, último
+    # import y filas vigentes) para no servir el catálogo de otra BD o de una
+    # BD re-sembrada que coincida en MAX(id).
+    db_file = ""
+    for row in con.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            db_file = os.path.normcase(os.path.abspath(row[2])) if row[2] else ""
+            break
+    last = con.execute(
+        "SELECT id, source_hash, imported_at FROM imports ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    n_prod = con.execute("SELECT COUNT(*) FROM products_current").fetchone()[0]
+    n_pres = con.execute("SELECT COUNT(*) FROM presentations_current").fetchone()[0]
+    if last is None:
+        imp = "0"
+    else:
+        imp = f"{int(last[0])}:{last[1]}:{last[2]}"
+    return f"{__version__}|db={db_file}|imports={imp}|rows={int(n_prod)},{int(n_pres)}"
+
+
+def load_catalog_cached(con, cache_dir: str, cursor=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Igual que load_catalog_from_db, pero guarda el resultado en `cache_dir`
+    y lo reutiliza mientras no haya imports nuevos (ni cambio de versión).
+    """
+    sig = _catalog_cache_signature(con)
+    sig_path = os.path.join(cache_dir, _CATALOG_CACHE_SIG)
+    prod_path = os.path.join(cache_dir, _CATALOG_CACHE_PROD)
+    pres_path = os.path.join(cache_dir, _CATALOG_CACHE_PRES)
+
+    try:
+        with open(sig_path, "r", encoding="utf-8") as f:
+            if f.read().strip() == sig:
+                return pd.read_pickle(prod_path), pd.read_pickle(pres_path)
+    except Exception:
+        pass
+
+    df_prod, df_pres = load_catalog_from_db(con, cursor=cursor)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # La firma se escribe al final: un cache a medio escribir nunca es válido.
+        if os.path.exists(sig_path):
+            os.remove(sig_path)
+        df_prod.to_pickle(prod_path)
+        df_pres.to_pickle(pres_path)
+        with open(sig_path, "w", encoding="utf-8") as f:
+            f.write(sig)
+    except Exception as e:
+        log.warning("No se pudo guardar el cache del catálogo: %s", e)
+
+    return df_prod, df_pres
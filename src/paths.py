@@ -46,7 +46,8 @@ def user_docs_root() -> str:
 
 
 def user_docs_dir(subfolder: str) -> str:
-    d = os.path.join(user_docs_root(), subfolder)
+    # Absoluta desde aquí: los llamadores abren la carpeta sin volver a resolverla.
+    d = os.path.abspath(os.path.join(user_docs_root(), subfolder))
     os.makedirs(d, exist_ok=True)
     return d
 
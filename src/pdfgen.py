@@ -337,6 +337,12 @@ def generar_pdf(datos: dict, fixed_quote_no: str | None = None, out_path: str |
 
     TEXT_COLOR = colors.HexColor("#551f31") if is_alt else colors.black
 
+    # Moneda con la que se convirtieron los montos (si el llamador la fijó).
+    pdf_currency = datos.get("currency") or None
+
+    def _money(n: float) -> str:
+        return fmt_money_pdf(n, pdf_currency)
+
     cliente_raw  = (datos.get("cliente","") or "").strip()
     cliente_slug = re.sub(r"[^A-Za-z0-9_-]+", "_", cliente_raw).strip("_")
     if fixed_quote_no:
@@ -504,14 +510,14 @@ def generar_pdf(datos: dict, fixed_quote_no: str | None = None, out_path: str |
 
             if is_alt:
                 qty_txt      = cantidad_para_mostrar(it)
-                precio_txt   = fmt_money_pdf(float(nz(it.get("precio"))))
-                subsin_txt   = fmt_money_pdf(float(nz(it.get("subtotal"))))
+                precio_txt   = _money(float(nz(it.get("precio"))))
+                subsin_txt   = _money(float(nz(it.get("subtotal"))))
 
                 # ✅ descuento SIN "-"
                 d = float(nz(it.get("descuento"), 0.0))
-                d_txt = fmt_money_pdf(abs(d))
+                d_txt = _money(abs(d))
 
-                subtotal_txt = fmt_money_pdf(float(nz(it.get("total"))))
+                subtotal_txt = _money(float(nz(it.get("total"))))
 
                 qty_lines      = _wrap_smart(c, qty_txt,      max_qty_width,      FONT_REG, body_fs)
                 precio_lines   = _wrap_smart(c, precio_txt,   max_precio_width,   FONT_REG, body_fs)
@@ -552,8 +558,8 @@ def generar_pdf(datos: dict, fixed_quote_no: str | None = None, out_path: str |
             else:
                 qty_txt = cantidad_para_mostrar(it)
                 c.drawRightString(ax_cantidad, row_y, qty_txt)
-                c.drawRightString(ax_precio,   row_y, fmt_money_pdf(float(nz(it.get("precio")))))
-                c.drawRightString(ax_subtotal, row_y, fmt_money_pdf(float(nz(it.get("total")))))
+                c.drawRightString(ax_precio,   row_y, _money(float(nz(it.get("precio")))))
+                c.drawRightString(ax_subtotal, row_y, _money(float(nz(it.get("total")))))
 
             obs_txt = (it.get("observacion") or "").strip()
             if obs_txt:
@@ -630,9 +636,9 @@ def generar_pdf(datos: dict, fixed_quote_no: str | None = None, out_path: str |
                 val = values[i]
                 # ✅ descuento SIN "-" para PE/PY (y también sin "-" en el total)
                 if i == 1 and is_alt:
-                    txt = fmt_money_pdf(abs(val))
+                    txt = _money(abs(val))
                 else:
-                    txt = fmt_money_pdf(val if i != 1 else abs(val))
+                    txt = _money(val if i != 1 else abs(val))
                     if i == 1 and val != 0:
                         txt = f"- {txt}"
 
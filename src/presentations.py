@@ -1,6 +1,8 @@
 import os
 import re
 import unicodedata
+from functools import lru_cache
+
 import pandas as pd
 
 from .utils import nz
@@ -272,18 +274,26 @@ def norm_pres_code(c: str) -> tuple[str, bool, bool]:
     return _norm_codigo_val(cu), False, False
 
 
+_ML_WITH_UNIT_RX = re.compile(r"(\d{2,4})\s*ml", re.I)
+_ML_ANY_DIGITS_RX = re.compile(r"(\d{2,4})")
+_ML_DIGITS_RX = re.compile(r"([0-9]{2,4})")
+_ML_CODE_RX = re.compile(r"0*([0-9]{2,4})")
+
+
+# Nombres y códigos se repiten entre clics/selectores: se parsean una sola vez.
+@lru_cache(maxsize=4096)
 def extract_ml_from_text(text: str) -> int:
     if not text:
         return 0
 
-    m = re.search(r"(\d{2,4})\s*ml", str(text), re.I)
+    m = _ML_WITH_UNIT_RX.search(str(text))
     if m:
         try:
             return int(m.group(1))
         except Exception:
             return 0
 
-    m2 = re.search(r"(\d{2,4})", str(text))
+    m2 = _ML_ANY_DIGITS_RX.search(str(text))
     if m2:
         try:
             return int(m2.group(1))
@@ -293,19 +303,20 @@ def extract_ml_from_text(text: str) -> int:
     return 0
 
 
+@lru_cache(maxsize=4096)
 def ml_from_pres_code_norm(code: str) -> int:
     if not code:
         return 0
 
     s = str(code).strip().upper()
-    m = re.fullmatch(r"0*([0-9]{2,4})", s)
+    m = _ML_CODE_RX.fullmatch(s)
     if m:
         try:
             return int(m.group(1))
         except Exception:
             return 0
 
-    m2 = re.search(r"([0-9]{2,4})", s)
+    m2 = _ML_DIGITS_RX.search(s)
     if m2:
         try:
             return int(m2.group(1))
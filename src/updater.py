@@ -13,6 +13,8 @@ Mejoras:
 - Ignora sqlModels/app.sqlite3 y updater/apply_update.exe
 - ✅ 404 legacy NO detiene la actualización si el archivo ya existe localmente.
 - ✅ Plan incluye changelog_rel para mostrar en el primer arranque post-update.
+- ✅ "Sin actualizaciones" se recuerda en update_state.json: throttle de
+  update_check_min_interval_seconds (6h) y GET condicional (ETag/Last-Modified).
 """
 
 import os
@@ -55,6 +57,10 @@ class DownloadNetError(RuntimeError):
         super().__init__(f"{rel}: Error de red: {reason} | URL={url}")
 
 
+class ManifestNotModified(RuntimeError):
+    """El servidor respondió 304 al GET condicional del manifiesto."""
+
+
 def _emit(ui: UiCb, kind: str, **payload) -> None:
     if not ui:
         return
@@ -222,26 +228,46 @@ def _cachebust(url: str) -> str:
     return f"{url}{sep}ts={int(time.time())}"
 
 
-def _http_get_raw(url: str, timeout: int = 12, log=None) -> bytes:
+def _http_get_raw(
+    url: str,
+    timeout: int = 12,
+    log=None,
+    validators: Dict[str, str] | None = None,
+    resp_meta: Dict[str, str] | None = None,
+) -> bytes:
+    """
+    `validators` ({"etag", "last_modified"}) vuelve condicional el GET:
+    un 304 lanza ManifestNotModified. Si se pasa `resp_meta`, se llena
+    con los validadores de la respuesta.
+    """
+    headers = {
+        "User-Agent": "Cotizador-Updater/1.6",
+        "Accept": "application/json,text/plain;q=0.9,*/*;q=0.8",
+        "Cache-Control": "no-cache",
+        "Pragma": "no-cache",
+    }
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = str(validators["etag"])
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = str(validators["last_modified"])
+
     last_err: Exception | None = None
     for u0 in _candidate_urls(url):
         u = _cachebust(u0)
-        req = urllib.request.Request(
-            u,
-            headers={
-                "User-Agent": "Cotizador-Updater/1.6",
-                "Accept": "application/json,text/plain;q=0.9,*/*;q=0.8",
-                "Cache-Control": "no-cache",
-                "Pragma": "no-cache",
-            },
-        )
+        req = urllib.request.Request(u, headers=headers)
         if log:
             log.debug(f"Updater: GET {u}")
 
         try:
             with _urlopen(req, timeout=timeout, log=log) as r:
+                if resp_meta is not None:
+                    resp_meta["etag"] = str(r.headers.get("ETag") or "")
+                    resp_meta["last_modified"] = str(r.headers.get("Last-Modified") or "")
                 return r.read()
         except Exception as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code == 304:
+                raise ManifestNotModified(u) from None
             last_err = e
             if log:
                 log.warning(f"Updater: fallo GET manifiesto con urllib: {e} | URL={u}")
@@ -268,9 +294,17 @@ def _http_get_raw(url: str, timeout: int = 12, log=None) -> bytes:
     raise RuntimeError("URL de manifiesto vacia")
 
 
-def _http_get_json(url: str, timeout: int = 12, log=None) -> Tuple[Dict[str, Any], str]:
+def _http_get_json(
+    url: str,
+    timeout: int = 12,
+    log=None,
+    validators: Dict[str, str] | None = None,
+    resp_meta: Dict[str, str] | None = None,
+) -> Tuple[Dict[str, Any], str]:
     try:
-        raw = _http_get_raw(url, timeout=timeout, log=log)
+        raw = _http_get_raw(url, timeout=timeout, log=log, validators=validators, resp_meta=resp_meta)
+    except ManifestNotModified:
+        raise
     except Exception as e:
         if log:
             log.warning(f"Updater: error descargando manifiesto: {e}")
@@ -501,6 +535,55 @@ def _should_backoff(state: Dict[str, Any]) -> bool:
         return False
 
 
+def _check_interval(app_config: Dict[str, Any]) -> int:
+    try:
+        return max(0, int(app_config.get("update_check_min_interval_seconds", 6 * 3600)))
+    except Exception:
+        return 6 * 3600
+
+
+def _recent_no_update(state: Dict[str, Any], manifest_url: str, local_version: str, interval: int) -> bool:
+    """
+    True si el último chequeo fue "sin actualizaciones" para el mismo
+    manifiesto y la misma versión local, hace menos de `interval` segundos.
+    """
+    if interval <= 0:
+        return False
+    if state.get("manifest_url") != manifest_url or state.get("manifest_local_version") != local_version:
+        return False
+    try:
+        return (time.time() - float(state.get("last_check_ts") or 0)) < interval
+    except Exception:
+        return False
+
+
+def _manifest_validators(state: Dict[str, Any], manifest_url: str, local_version: str) -> Dict[str, str] | None:
+    # Un 304 solo sirve si el último 200 se evaluó contra esta misma versión local.
+    if state.get("manifest_url") != manifest_url or state.get("manifest_local_version") != local_version:
+        return None
+    etag = str(state.get("manifest_etag") or "")
+    last_modified = str(state.get("manifest_last_modified") or "")
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "last_modified": last_modified}
+
+
+def _mark_no_update(
+    state: Dict[str, Any],
+    manifest_url: str,
+    local_version: str,
+    resp_meta: Dict[str, str] | None = None,
+    log=None,
+) -> None:
+    state["manifest_url"] = manifest_url
+    state["manifest_local_version"] = local_version
+    state["last_check_ts"] = int(time.time())
+    if resp_meta is not None:
+        state["manifest_etag"] = str(resp_meta.get("etag") or "")
+        state["manifest_last_modified"] = str(resp_meta.get("last_modified") or "")
+    _write_state(state, log=log)
+
+
 def _mark_failure(app_config: Dict[str, Any], state: Dict[str, Any], remote_version: str, err: Exception, log=None) -> int:
     base, maxs = _retry_params(app_config)
     pending = str(state.get("pending_version") or "")
@@ -894,14 +977,33 @@ def check_for_updates_and_maybe_install(app_config: Dict[str, Any], ui: UiCb = N
         except Exception:
             local_version = "0.0.0"
 
+        # Contrato: solo "sin actualizaciones" se cachea (throttle + ETag/Last-Modified);
+        # un update pendiente o un fallo siempre vuelve a consultar el manifiesto.
+        if _recent_no_update(state, manifest_url, local_version, _check_interval(app_config)):
+            return {"status": "NO_UPDATE_RECENT", "local": local_version}
+
         _emit(ui, "status", text="Buscando actualizaciones…")
-        manifest, _raw = _http_get_json(manifest_url, timeout=12, log=log)
+        resp_meta: Dict[str, str] = {}
+        try:
+            manifest, _raw = _http_get_json(
+                manifest_url,
+                timeout=12,
+                log=log,
+                validators=_manifest_validators(state, manifest_url, local_version),
+                resp_meta=resp_meta,
+            )
+        except ManifestNotModified:
+            _mark_no_update(state, manifest_url, local_version, log=log)
+            _emit(ui, "status", text="Sin actualizaciones.")
+            return {"status": "NO_UPDATE", "local": local_version, "not_modified": True}
+
         remote_version = str(manifest.get("version", "")).strip()
         if not remote_version:
             return {"status": "NO_REMOTE_VERSION"}
 
         if not _is_newer(remote_version, local_version):
             _clear_failure(state, log=log)
+            _mark_no_update(state, manifest_url, local_version, resp_meta=resp_meta, log=log)
             _emit(ui, "status", text="Sin actualizaciones.")
             return {"status": "NO_UPDATE", "local": local_version, "remote": remote_version}
 
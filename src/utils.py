@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import math
+from functools import lru_cache
 from .config import APP_CURRENCY, get_currency_context
 from .currency import normalize_currency_code, symbol_ui, symbol_pdf
 
@@ -49,24 +50,31 @@ def _current_currency_code() -> str:
     return normalize_currency_code(APP_CURRENCY or "")
 
 
+@lru_cache(maxsize=4096)
+def _fmt_money(sym: str, n: float) -> str:
+    # La clave incluye el símbolo: un cambio de moneda no deja entradas obsoletas.
+    return f"{sym} {n:0.2f}"
+
+
 def fmt_money_ui(n: float) -> str:
     """
     Formato para la UI usando la moneda actual (canónica).
     """
-    n = nz(n, 0.0)
+    # + 0.0 normaliza -0.0 (igual a 0.0 como clave de caché).
+    n = nz(n, 0.0) + 0.0
     cur = _current_currency_code()
     sym = symbol_ui(cur)
-    return f"{sym} {n:0.2f}"
+    return _fmt_money(sym, n)
 
 
-def fmt_money_pdf(n: float) -> str:
+def fmt_money_pdf(n: float, cur: str | None = None) -> str:
     """
-    Formato para PDF usando la moneda actual (canónica).
+    Formato para PDF usando `cur` o, si no se indica, la moneda actual (canónica).
     """
-    n = nz(n, 0.0)
-    cur = _current_currency_code()
+    n = nz(n, 0.0) + 0.0
+    cur = normalize_currency_code(cur or "") or _current_currency_code()
     sym = symbol_pdf(cur)
-    return f"{sym} {n:0.2f}"
+    return _fmt_money(sym, n)
 
 
 def format_grams(g: float) -> str:
@@ -3,16 +3,15 @@ from __future__ import annotations
 
 import math
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QIcon, QBrush
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
     QLabel,
-    QTableWidget,
+    QTableView,
     QHeaderView,
     QAbstractItemView,
-    QTableWidgetItem,
     QPushButton,
     QWidget,
 )
@@ -23,6 +22,9 @@ from ..product_rules import is_py_unit_product
 from ..utils import fmt_money_ui, nz
 
 
+_CATS_SET = frozenset(CATS)
+
+
 def _fmt_qty(x: float) -> str:
     """Formatea cantidades: si es entero, sin decimales; si no, con decimales limpios."""
     try:
@@ -48,6 +50,83 @@ def _esencia_a_gramos(it: dict, cant: float) -> float:
     return cant * 1000.0
 
 
+def _preview_row(it: dict) -> tuple[str, ...]:
+    """Textos de una fila de la previsualización (montos en la moneda mostrada)."""
+    prod = it.get("producto", "")
+    if it.get("fragancia"):
+        prod += f" ({it['fragancia']})"
+    if it.get("observacion"):
+        prod += f" | {it['observacion']}"
+
+    d_monto_base = nz(it.get("descuento_monto"), 0.0)
+    d_pct = nz(it.get("descuento_pct"), 0.0)
+    if d_pct > 0:
+        desc_txt = f"-{d_pct:.1f}%"
+    elif d_monto_base > 0:
+        desc_txt = "-" + fmt_money_ui(convert_from_base(d_monto_base))
+    else:
+        desc_txt = "—"
+
+    vals = (
+        it.get("codigo", ""),
+        prod,
+        cantidad_para_mostrar(it),
+        fmt_money_ui(convert_from_base(nz(it.get("precio"), 0.0))),
+        desc_txt,
+        fmt_money_ui(convert_from_base(nz(it.get("total"), 0.0))),
+    )
+    return tuple(str(val) for val in vals)
+
+
+def _rich_label(lines: list[str]) -> QLabel:
+    """Un QLabel con una línea (HTML) por entrada, en vez de un QLabel por línea."""
+    lbl = QLabel("<br>".join(lines))
+    lbl.setTextFormat(Qt.RichText)
+    return lbl
+
+
+class PreviewTableModel(QAbstractTableModel):
+    """Ítems de solo lectura; cada fila se formatea la primera vez que la vista la pide."""
+
+    HEADERS = ["Código", "Producto", "Cantidad", "Precio", "Descuento", "Subtotal"]
+    QTY_COL = 2
+
+    def __init__(self, items: list[dict], low_stock: bytearray):
+        super().__init__()
+        self.items = items
+        self.rows: list[tuple[str, ...] | None] = [None] * len(items)
+        self.low_stock = low_stock
+        self._red = QBrush(Qt.red)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and 0 <= section < len(self.HEADERS):
+            return self.HEADERS[section]
+        if orientation == Qt.Vertical:
+            return str(section + 1)
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            r = index.row()
+            row = self.rows[r]
+            if row is None:
+                row = self.rows[r] = _preview_row(self.items[r])
+            return row[index.column()]
+        if role == Qt.ForegroundRole and index.column() == self.QTY_COL and self.low_stock[index.row()]:
+            return self._red
+        return None
+
+
 def show_preview_dialog(
     parent: QWidget,
     app_icon: QIcon,
@@ -61,25 +140,19 @@ def show_preview_dialog(
     dlg.setWindowTitle("Previsualización de Cotización")
     dlg.resize(860, 520)
     if not app_icon.isNull():
-        parent.setWindowIcon(app_icon)
         dlg.setWindowIcon(app_icon)
 
     v = QVBoxLayout(dlg)
     id_lbl = id_label_for_country(APP_COUNTRY)
-    v.addWidget(QLabel(f"<b>Nombre:</b> {cliente}"))
-    v.addWidget(QLabel(f"<b>{id_lbl}:</b> {cedula}"))
-    v.addWidget(QLabel(f"<b>Teléfono:</b> {telefono}"))
-
-    tbl = QTableWidget(0, 6)
-    tbl.setHorizontalHeaderLabels(
-        ["Código", "Producto", "Cantidad", "Precio", "Descuento", "Subtotal"]
+    v.addWidget(
+        _rich_label(
+            [
+                f"<b>Nombre:</b> {cliente}",
+                f"<b>{id_lbl}:</b> {cedula}",
+                f"<b>Teléfono:</b> {telefono}",
+            ]
+        )
     )
-    tbl.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-    tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
-    tbl.setSelectionMode(QAbstractItemView.NoSelection)
-    tbl.setAlternatingRowColors(True)
-    tbl.setShowGrid(False)
-    tbl.verticalHeader().setVisible(True)
 
     subtotal_bruto_base = 0.0
     descuento_total_base = 0.0
@@ -89,93 +162,67 @@ def show_preview_dialog(
     total_botellas = 0.0
     total_esencias_g = 0.0
 
-    for it in items:
-        r = tbl.rowCount()
-        tbl.insertRow(r)
-
-        prod = it.get("producto", "")
-        if it.get("fragancia"):
-            prod += f" ({it['fragancia']})"
-        if it.get("observacion"):
-            prod += f" | {it['observacion']}"
+    low_stock = bytearray(len(items))
+    is_ve = APP_COUNTRY == "VENEZUELA"
 
-        qty_txt = cantidad_para_mostrar(it)
-
-        precio_base = float(nz(it.get("precio"), 0.0))
-        total_line_base = float(nz(it.get("total"), 0.0))
-        subtotal_line_base = float(
-            nz(it.get("subtotal_base"), precio_base * nz(it.get("cantidad"), 0.0))
-        )
-        d_monto_base = float(nz(it.get("descuento_monto"), 0.0))
-        d_pct = float(nz(it.get("descuento_pct"), 0.0))
+    for r, it in enumerate(items):
+        # nz ya devuelve float (y filtra NaN/inf): no hace falta envolver en float().
+        precio_base = nz(it.get("precio"), 0.0)
+        total_line_base = nz(it.get("total"), 0.0)
+        cant = nz(it.get("cantidad"), 0.0)
+        subtotal_line_base = nz(it.get("subtotal_base"), precio_base * cant)
+        d_monto_base = nz(it.get("descuento_monto"), 0.0)
 
         subtotal_bruto_base += subtotal_line_base
         descuento_total_base += d_monto_base
         total_neto_base += total_line_base
 
-        precio_ui = fmt_money_ui(convert_from_base(precio_base))
-        subtotal_ui = fmt_money_ui(convert_from_base(total_line_base))
-
-        if d_pct > 0:
-            desc_txt = f"-{d_pct:.1f}%"
-        elif d_monto_base > 0:
-            desc_txt = "-" + fmt_money_ui(convert_from_base(d_monto_base))
-        else:
-            desc_txt = "—"
-
-        vals = [it.get("codigo", ""), prod, qty_txt, precio_ui, desc_txt, subtotal_ui]
-        for col, val in enumerate(vals):
-            tbl.setItem(r, col, QTableWidgetItem(str(val)))
-
         # Categoría / cantidades para labels
         try:
             cat_u = (it.get("categoria") or "").upper()
-            cant = float(nz(it.get("cantidad"), 0.0))
+        except Exception:
+            continue
+        is_esencia = cat_u in _CATS_SET
 
-            if cat_u == "BOTELLAS":
-                total_botellas += cant
+        if cat_u == "BOTELLAS":
+            total_botellas += cant
 
-            if cat_u in CATS:
+        if is_esencia:
+            try:
                 total_esencias_g += _esencia_a_gramos(it, cant)
-        except Exception:
-            pass
+            except Exception:
+                pass
 
         # Chequeo de stock visual
         try:
-            cat_u = (it.get("categoria") or "").upper()
-            disp = float(nz(it.get("stock_disponible"), 0.0))
-            cant = float(nz(it.get("cantidad"), 0.0))
-            mult = factor_total_por_categoria(cat_u, it)
-            if APP_COUNTRY == "VENEZUELA" and cat_u in CATS:
-                mult = 50.0
+            disp = nz(it.get("stock_disponible"), 0.0)
+            mult = 50.0 if (is_ve and is_esencia) else factor_total_por_categoria(cat_u, it)
             if cant * mult > disp and disp >= 0.0:
-                qty_item = tbl.item(r, 2)
-                if qty_item:
-                    qty_item.setForeground(QBrush(Qt.red))
+                low_stock[r] = 1
         except Exception:
             pass
 
+    tbl = QTableView()
+    model = PreviewTableModel(items, low_stock)
+    tbl.setModel(model)
+    tbl.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    tbl.setSelectionMode(QAbstractItemView.NoSelection)
+    tbl.setAlternatingRowColors(True)
+    tbl.setShowGrid(False)
+    tbl.verticalHeader().setVisible(True)
     v.addWidget(tbl)
 
-    # Labels adicionales (solo si aplica)
+    # Labels adicionales (solo si aplica) + totales, en un solo QLabel
+    lines = []
     if total_botellas > 0:
-        v.addWidget(QLabel(f"<b>Total de Botellas:</b> {_fmt_qty(total_botellas)}"))
+        lines.append(f"<b>Total de Botellas:</b> {_fmt_qty(total_botellas)}")
     if total_esencias_g > 0:
-        v.addWidget(QLabel(f"<b>Total de Esencias:</b> {_fmt_qty(total_esencias_g)} g"))
-
-    v.addWidget(
-        QLabel(
-            f"<b>Subtotal sin descuento:</b> {fmt_money_ui(convert_from_base(subtotal_bruto_base))}"
-        )
-    )
-    v.addWidget(
-        QLabel(
-            f"<b>Descuento total:</b> -{fmt_money_ui(convert_from_base(descuento_total_base))}"
-        )
-    )
-    v.addWidget(
-        QLabel(f"<b>Total General:</b> {fmt_money_ui(convert_from_base(total_neto_base))}")
-    )
+        lines.append(f"<b>Total de Esencias:</b> {_fmt_qty(total_esencias_g)} g")
+    lines.append(f"<b>Subtotal sin descuento:</b> {fmt_money_ui(convert_from_base(subtotal_bruto_base))}")
+    lines.append(f"<b>Descuento total:</b> -{fmt_money_ui(convert_from_base(descuento_total_base))}")
+    lines.append(f"<b>Total General:</b> {fmt_money_ui(convert_from_base(total_neto_base))}")
+    v.addWidget(_rich_label(lines))
 
     btn = QPushButton("Cerrar")
     btn.setProperty("variant", "primary")
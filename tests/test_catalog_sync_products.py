@@ -3,7 +3,12 @@ from pathlib import Path
 import pandas as pd
 
 from sqlModels.db import connect, ensure_schema
-from src.catalog_sync import sync_catalog_from_excel_path, sync_catalog_from_excel_to_db
+from src.catalog_sync import (
+    load_catalog_cached,
+    load_catalog_from_db,
+    sync_catalog_from_excel_path,
+    sync_catalog_from_excel_to_db,
+)
 
 
 def _products_df(codes: list[str], fuente: str) -> pd.DataFrame:
@@ -142,3 +147,104 @@ def test_schema_drops_duplicate_catalog_tables(tmp_path):
     assert _table_exists(con, "presentacion_prod_hist")
 
     con.close()
+
+
+def test_load_catalog_from_db_downcasts_ints_and_keeps_prices_float64(tmp_path, monkeypatch):
+    db_path = tmp_path / "catalog.sqlite3"
+    con = connect(str(db_path))
+    ensure_schema(con)
+
+    excel = tmp_path / "inventario.xlsx"
+    excel.write_text("v1", encoding="utf-8")
+    _patch_catalog_readers(monkeypatch, {excel.name: _products_df(["AAA001", "BBB001"], excel.name)})
+    sync_catalog_from_excel_path(con, str(excel))
+
+    df_prod, _df_pres = load_catalog_from_db(con)
+
+    assert df_prod["precio_venta"].dtype.itemsize == 1
+    assert df_prod["p_min"].dtype == "float64"
+    assert df_prod.to_dict("records")[0]["p_min"] == 0.9
+
+    con.close()
+
+
+def test_sync_catalog_from_excel_to_db_skips_unchanged_excels(tmp_path, monkeypatch):
+    db_path = tmp_path / "catalog.sqlite3"
+    con = connect(str(db_path))
+    ensure_schema(con)
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    lcdp = data_dir / "inventario_lcdp.xlsx"
+    lcdp.write_text("lcdp-v1", encoding="utf-8")
+
+    _patch_catalog_readers(monkeypatch, {lcdp.name: _products_df(["AAA001"], lcdp.name)})
+    sync_catalog_from_excel_to_db(con, str(data_dir))
+
+    monkeypatch.setattr(
+        "src.catalog_sync.imports_repo.needs_import",
+        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("no debe revisar imports sin cambios")),
+    )
+    sync_catalog_from_excel_to_db(con, str(data_dir))
+    assert _current_products(con) == [("AAA001", lcdp.name)]
+
+    con.close()
+
+
+def test_load_catalog_cached_reuses_cache_until_new_import(tmp_path, monkeypatch):
+    db_path = tmp_path / "catalog.sqlite3"
+    con = connect(str(db_path))
+    ensure_schema(con)
+    cache_dir = tmp_path / "_cache"
+
+    excel = tmp_path / "inventario.xlsx"
+    excel.write_text("v1", encoding="utf-8")
+    _patch_catalog_readers(monkeypatch, {excel.name: _products_df(["AAA001"], excel.name)})
+    sync_catalog_from_excel_path(con, str(excel))
+
+    df_prod, _df_pres = load_catalog_cached(con, str(cache_dir))
+    assert list(df_prod["id"]) == ["AAA001"]
+
+    real_loader = load_catalog_from_db
+    monkeypatch.setattr(
+        "src.catalog_sync.load_catalog_from_db",
+        lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("debe usar el cache")),
+    )
+    df_cached, _ = load_catalog_cached(con, str(cache_dir))
+    assert list(df_cached["id"]) == ["AAA001"]
+    assert df_cached["precio_venta"].dtype == df_prod["precio_venta"].dtype
+
+    monkeypatch.setattr("src.catalog_sync.load_catalog_from_db", real_loader)
+    excel.write_text("v2", encoding="utf-8")
+    _patch_catalog_readers(monkeypatch, {excel.name: _products_df(["AAA001", "BBB001"], excel.name)})
+    sync_catalog_from_excel_path(con, str(excel))
+
+    df_new, _ = load_catalog_cached(con, str(cache_dir))
+    assert sorted(df_new["id"]) == ["AAA001", "BBB001"]
+
+    con.close()
+
+
+def test_load_catalog_cached_ignores_cache_from_another_db(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "_cache"
+
+    def _seed(name: str, ids: list[str]):
+        con = connect(str(tmp_path / f"{name}.sqlite3"))
+        ensure_schema(con)
+        excel = tmp_path / name / "inventario.xlsx"
+        excel.parent.mkdir()
+        excel.write_text(name, encoding="utf-8")
+        _patch_catalog_readers(monkeypatch, {excel.name: _products_df(ids, excel.name)})
+        sync_catalog_from_excel_path(con, str(excel))
+        return con
+
+    con_a = _seed("a", ["AAA001"])
+    df_a, _ = load_catalog_cached(con_a, str(cache_dir))
+    assert list(df_a["id"]) == ["AAA001"]
+    con_a.close()
+
+    # Misma cantidad de imports (mismo MAX(id)), otra BD: no debe servir el cache de "a".
+    con_b = _seed("b", ["BBB001"])
+    df_b, _ = load_catalog_cached(con_b, str(cache_dir))
+    assert list(df_b["id"]) == ["BBB001"]
+    con_b.close()
@@ -78,3 +78,13 @@ def test_build_completer_strings_uses_category_marker_as_wildcard():
     assert not any(s.startswith("BASE020003 - ") for s in sugs)
     assert not any(s.startswith("FIJ0010003 - ") for s in sugs)
     assert not any(s.startswith("ESENCIAS0003 - ") for s in sugs)
+
+
+def test_suggestion_index_matches_contains_while_typing_and_deleting():
+    SuggestionIndex = sys.modules["src.app_window_parts.completer"].SuggestionIndex
+    sugs = ["A1 - Rosa Negra - ESENCIAS", "B2 - Rosa - PRESENTACION", "C3 - Negro - OTROS", "ro"]
+    index = SuggestionIndex(sugs)
+
+    for text in ["r", "ro", "ros", "rosa n", "rosa", "r", "NEG", "neg", "", "o"]:
+        expected = [s for s in sugs if text.casefold() in s.casefold()] if text else []
+        assert index.search(text) == expected
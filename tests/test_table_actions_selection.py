@@ -31,6 +31,7 @@ def _load_table_actions_mixin():
 
     models_mod = types.ModuleType("src.app_window_parts.models")
     models_mod.CAN_EDIT_UNIT_PRICE = True
+    models_mod._item_cat_u = lambda item: (item.get("categoria") or "").upper()
     sys.modules.setdefault("src.app_window_parts.models", models_mod)
 
     spec = importlib.util.spec_from_file_location(module_name, app_parts_dir / "table_actions.py")
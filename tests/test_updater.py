@@ -259,3 +259,34 @@ def test_download_tries_next_candidate_when_first_url_fails(tmp_path, monkeypatc
 
     assert calls == ["https://example.invalid/primary.exe", "https://example.invalid/fallback.exe"]
     assert dest.read_bytes() == b"ok"
+
+
+def test_check_for_updates_throttles_and_revalidates_after_no_update(tmp_path, monkeypatch):
+    app_root = tmp_path / "app"
+    _write_local_version(app_root, "2.0.5")
+    manifest_url = "https://example.invalid/config/cotizador.json"
+
+    calls: list[dict] = []
+
+    def fake_get_json(url, timeout=12, log=None, validators=None, resp_meta=None):
+        calls.append({"validators": validators})
+        if validators:
+            raise updater.ManifestNotModified(url)
+        resp_meta.update({"etag": '"abc"', "last_modified": ""})
+        return {"version": "2.0.5"}, "{}"
+
+    monkeypatch.setattr(updater, "_app_root", lambda: str(app_root))
+    monkeypatch.setattr(updater, "_http_get_json", fake_get_json)
+
+    first = updater.check_for_updates_and_maybe_install({"update_manifest_url": manifest_url})
+    assert first["status"] == "NO_UPDATE"
+
+    throttled = updater.check_for_updates_and_maybe_install({"update_manifest_url": manifest_url})
+    assert throttled["status"] == "NO_UPDATE_RECENT"
+    assert len(calls) == 1
+
+    revalidated = updater.check_for_updates_and_maybe_install(
+        {"update_manifest_url": manifest_url, "update_check_min_interval_seconds": 0}
+    )
+    assert revalidated == {"status": "NO_UPDATE", "local": "2.0.5", "not_modified": True}
+    assert calls[-1]["validators"] == {"etag": '"abc"', "last_modified": ""}